@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ComponentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'components'
\ No newline at end of file
+    name = 'components'
+
+    def ready(self):
+        from . import signals  # noqa: F401
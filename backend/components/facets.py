@@ -0,0 +1,101 @@
+import threading
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from .models import CategoryFacetIndex, Component, ComponentCategory
+from .specs import FACET_FIELDS
+
+FACET_CACHE_KEY = "components:facets:{}"
+FACET_CACHE_TIMEOUT = 60 * 60
+
+_deferred = threading.local()
+
+
+def facet_cache_key(category_name):
+    return FACET_CACHE_KEY.format(category_name.lower())
+
+
+def build_facets(category):
+    """Collect the distinct manufacturer and spec values of a category"""
+    components = Component.objects.filter(category=category)
+    manufacturers = list(
+        components.exclude(brand__isnull=True)
+        .exclude(brand="")
+        .values_list("brand", flat=True)
+        .distinct()
+    )
+
+    specs = {}
+    for facet, column in FACET_FIELDS.get(category.name.upper(), {}).items():
+        specs[facet] = list(
+            components.exclude(**{f"{column}__isnull": True})
+            .order_by(column)
+            .values_list(column, flat=True)
+            .distinct()
+        )
+
+    return {"manufacturers": manufacturers, "specs": specs}, components.count()
+
+
+def rebuild_facet_index(category):
+    facets, component_count = build_facets(category)
+    index, _ = CategoryFacetIndex.objects.update_or_create(
+        category=category,
+        defaults={"facets": facets, "component_count": component_count},
+    )
+    invalidate_facets(category.name)
+    return index
+
+
+def invalidate_facets(category_name):
+    cache.delete(facet_cache_key(category_name))
+
+
+def get_category_facets(category_name):
+    """Return the facet index of a category, from the cache when possible"""
+    key = facet_cache_key(category_name)
+    facets = cache.get(key)
+    if facets is not None:
+        return facets
+
+    index = (
+        CategoryFacetIndex.objects.filter(category__name__iexact=category_name)
+        .only("facets")
+        .first()
+    )
+    if index is None:
+        category = ComponentCategory.objects.filter(name__iexact=category_name).first()
+        if category is None:
+            return {"manufacturers": [], "specs": {}}
+        index = rebuild_facet_index(category)
+
+    cache.set(key, index.facets, FACET_CACHE_TIMEOUT)
+    return index.facets
+
+
+def schedule_facet_rebuild(category_id):
+    """Rebuild now, or at the end of the enclosing defer_facet_rebuild() block"""
+    pending = getattr(_deferred, "category_ids", None)
+    if pending is not None:
+        pending.add(category_id)
+        return
+    category = ComponentCategory.objects.filter(pk=category_id).first()
+    if category:
+        rebuild_facet_index(category)
+
+
+@contextmanager
+def defer_facet_rebuild():
+    """Batch facet rebuilds triggered by component writes, e.g. during imports"""
+    if getattr(_deferred, "category_ids", None) is not None:
+        yield
+        return
+    _deferred.category_ids = set()
+    try:
+        yield
+    finally:
+        category_ids = _deferred.category_ids
+        _deferred.category_ids = None
+    for category in ComponentCategory.objects.filter(pk__in=category_ids):
+        rebuild_facet_index(category)
@@ -0,0 +1,74 @@
+import json
+from itertools import islice
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_records(path, chunk_size=CHUNK_SIZE):
+    """Yield the records of a JSON array or newline-delimited JSON file one at a time
+
+    The format is detected from the first non-whitespace character, and the
+    file is read in chunks so memory does not grow with the file size.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(chunk_size)
+        stripped = head.lstrip()
+        if stripped.startswith("["):
+            yield from _iter_json_array(f, stripped[1:], chunk_size)
+            return
+
+        pending = head
+        while True:
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+        if pending.strip():
+            yield json.loads(pending)
+
+
+def _iter_json_array(f, buffer, chunk_size):
+    pos = 0
+    eof = False
+    while True:
+        # Skip separators between elements
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        try:
+            if pos == len(buffer):
+                raise ValueError("need more data")
+            record, end = _decoder.raw_decode(buffer, pos)
+            # A scalar cut at the chunk boundary ("3." then "25") decodes
+            # early; only accept an element once its delimiter is buffered
+            after = end
+            while after < len(buffer) and buffer[after] in " \t\r\n":
+                after += 1
+            if after == len(buffer) or buffer[after] not in ",]":
+                raise ValueError("need more data")
+        except ValueError:
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield record
+        pos = end
+
+
+def batched(iterable, size):
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -1,7 +1,11 @@
 import os
-import json
+import time
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from components.facets import defer_facet_rebuild, schedule_facet_rebuild
+from components.ingest import iter_json_records
 from components.models import Component, ComponentCategory
+from components.specs import SPEC_COLUMNS
 
 COMPONENT_MAP = {
     "cpu.json": "CPU",
@@ -12,6 +16,20 @@ COMPONENT_MAP = {
 }
 
 
+def parse_item(item):
+    """Split a dataset item into its (name, brand, model) key and specs"""
+    name = item.get("name")
+    if name:
+        brand = name.split()[0]
+    else:
+        brand = ""
+    model = item.get("model", "")
+
+    # Remove these from specs
+    specs = {k: v for k, v in item.items() if k not in ("name", "brand", "model")}
+    return name, brand, model, specs
+
+
 class Command(BaseCommand):
     help = "Import multiple component types from separate JSON files"
 
@@ -19,48 +37,138 @@ class Command(BaseCommand):
         parser.add_argument(
             "folder",
             type=str,
-            help="Folder containing all component json files (e.g., data/)",
+            help="Folder containing all component json files (e.g., data/); each file may be a JSON array or newline-delimited JSON",
+        )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Use batched bulk_create/bulk_update inside one transaction (for full catalog reloads)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows written per bulk_create/bulk_update batch in --bulk mode (default=1000)",
         )
 
     def handle(self, *args, **options):
         folder = options["folder"]
         added, updated = 0, 0
-        for filename, category_name in COMPONENT_MAP.items():
-            path = os.path.join(folder, filename)
-            if not os.path.exists(path):
-                self.stdout.write(
-                    self.style.WARNING(f"File not found: {filename}, skipping")
-                )
-                continue
+        started = time.perf_counter()
+        # Rebuild each category facet index once, after all of its rows are written
+        with defer_facet_rebuild(), transaction.atomic():
+            for filename, category_name in COMPONENT_MAP.items():
+                path = os.path.join(folder, filename)
+                if not os.path.exists(path):
+                    self.stdout.write(
+                        self.style.WARNING(f"File not found: {filename}, skipping")
+                    )
+                    continue
 
-            with open(path, "r", encoding="utf-8") as f:
-                items = json.load(f)
-            cat_obj, _ = ComponentCategory.objects.get_or_create(name=category_name)
+                items = iter_json_records(path)
+                cat_obj, _ = ComponentCategory.objects.get_or_create(name=category_name)
 
-            for item in items:
-                name = item.get("name")
-                if name:
-                    brand = name.split()[0]
+                if options["bulk"]:
+                    file_added, file_updated = self.import_bulk(
+                        items, cat_obj, options["batch_size"]
+                    )
                 else:
-                    brand = ""
-                model = item.get("model", "")
-
-                # Remove these from specs
-                specs = {
-                    k: v for k, v in item.items() if k not in ("name", "brand", "model")
-                }
-
-                obj, created = Component.objects.update_or_create(
-                    name=name,
-                    brand=brand,
-                    model=model,
-                    category=cat_obj,
-                    defaults={"specs": specs},
-                )
-                if created:
-                    added += 1
-                else:
-                    updated += 1
+                    file_added, file_updated = self.import_each(items, cat_obj)
+                added += file_added
+                updated += file_updated
+
+        elapsed = time.perf_counter() - started
+        rows = added + updated
         self.stdout.write(
             self.style.SUCCESS(f"Import complete: {added} new, {updated} updated.")
         )
+        self.stdout.write(
+            f"Processed {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+
+    def import_each(self, items, cat_obj):
+        added, updated = 0, 0
+        for item in items:
+            name, brand, model, specs = parse_item(item)
+            obj, created = Component.objects.update_or_create(
+                name=name,
+                brand=brand,
+                model=model,
+                category=cat_obj,
+                defaults={"specs": specs},
+            )
+            if created:
+                added += 1
+            else:
+                updated += 1
+        return added, updated
+
+    def import_bulk(self, items, cat_obj, batch_size):
+        """Upsert items with bulk_create/bulk_update against pre-loaded natural keys"""
+        existing = {
+            (name, brand, model): (pk, specs)
+            for pk, name, brand, model, specs in Component.objects.filter(
+                category=cat_obj
+            ).values_list("pk", "name", "brand", "model", "specs")
+        }
+        # Pending rows are keyed so duplicates within the file collapse into one write
+        to_create, to_update = {}, {}
+        added, updated = 0, 0
+
+        for item in items:
+            name, brand, model, specs = parse_item(item)
+            key = (name, brand, model)
+            pk, stored_specs = existing.get(key, (None, None))
+            if pk and stored_specs == specs and pk not in to_update:
+                # Unchanged rows still count as updated, as with update_or_create
+                updated += 1
+                continue
+            component = Component(
+                pk=pk,
+                category=cat_obj,
+                name=name,
+                brand=brand,
+                model=model,
+                specs=specs,
+            )
+            component.apply_normalized_specs()
+
+            if component.pk:
+                to_update[component.pk] = component
+                existing[key] = (component.pk, specs)
+                updated += 1
+            else:
+                if key in to_create:
+                    updated += 1
+                else:
+                    added += 1
+                to_create[key] = component
+
+            if len(to_create) >= batch_size:
+                self.flush_creates(to_create, existing, batch_size)
+            if len(to_update) >= batch_size:
+                self.flush_updates(to_update, batch_size)
+
+        self.flush_creates(to_create, existing, batch_size)
+        self.flush_updates(to_update, batch_size)
+        # Bulk writes bypass the Component signals
+        schedule_facet_rebuild(cat_obj.pk)
+        return added, updated
+
+    @staticmethod
+    def flush_creates(to_create, existing, batch_size):
+        if not to_create:
+            return
+        Component.objects.bulk_create(list(to_create.values()), batch_size=batch_size)
+        for key, component in to_create.items():
+            existing[key] = (component.pk, component.specs)
+        to_create.clear()
+
+    @staticmethod
+    def flush_updates(to_update, batch_size):
+        if not to_update:
+            return
+        Component.objects.bulk_update(
+            list(to_update.values()), ["specs", *SPEC_COLUMNS], batch_size=batch_size
+        )
+        to_update.clear()
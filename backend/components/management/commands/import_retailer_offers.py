@@ -1,16 +1,10 @@
-import json
+import time
+from collections import Counter, defaultdict
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from components.ingest import batched, iter_json_records
 from components.models import RetailerComponentOffer
-
-
-def parse_availability(val):
-    """Convert 'Out of Stock' and similar to boolean False, otherwise True."""
-    if isinstance(val, bool):
-        return val
-    if val is None:
-        return True  # Default to True if not specified
-    val = str(val).strip().lower()
-    return val in ["true", "1", "in stock", "available", "yes"]
+from components.offers import build_offer, upsert_offers
 
 
 class Command(BaseCommand):
@@ -18,37 +12,55 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument(
-            "json_path", type=str, help="Path to scraped_components.json"
+            "json_path",
+            type=str,
+            help="Path to scraped_components.json (JSON array or newline-delimited JSON)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Offers written per INSERT ... ON CONFLICT statement (default=1000)",
         )
 
     def handle(self, *args, **options):
         json_path = options["json_path"]
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        count_created = 0
-        count_updated = 0
-
-        for item in data:
-            obj, created = RetailerComponentOffer.objects.update_or_create(
-                retailer=item["retailer"],
-                retailer_name=item["retailer_name"],
-                url=item["url"],
-                defaults={
-                    "price": item.get("price"),
-                    "image_url": item.get("image_url"),
-                    "availability": parse_availability(item.get("availability")),
-                    "category": item.get("category", "Unknown"),
-                    "model_name": item.get("model"),
-                },
-            )
-            if created:
-                count_created += 1
-            else:
-                count_updated += 1
 
+        totals = Counter()
+        seen_urls = defaultdict(set)
+        timings = defaultdict(lambda: {"offers": 0, "seconds": 0.0})
+
+        for batch in batched(iter_json_records(json_path), options["batch_size"]):
+            # A statement may not touch the same row twice, so the last
+            # occurrence of a (retailer, url) key in the batch wins
+            by_retailer = defaultdict(dict)
+            for item in batch:
+                offer = build_offer(item)
+                by_retailer[offer.retailer][offer.url] = offer
+
+            for retailer, offers in by_retailer.items():
+                started = time.perf_counter()
+                with transaction.atomic():
+                    result = upsert_offers(retailer, list(offers.values()))
+                totals.update(result)
+                seen_urls[retailer].update(offers)
+                timings[retailer]["offers"] += len(offers)
+                timings[retailer]["seconds"] += time.perf_counter() - started
+
+        # Offers of the imported retailers that were missing from this scrape
+        disappeared = 0
+        for retailer, urls in seen_urls.items():
+            stored = RetailerComponentOffer.objects.filter(retailer=retailer).count()
+            disappeared += stored - len(urls)
+
+        for retailer, timing in sorted(timings.items()):
+            self.stdout.write(
+                f"{retailer}: {timing['offers']} offers in {timing['seconds']:.2f}s"
+            )
         self.stdout.write(
             self.style.SUCCESS(
-                f"Import finished. {count_created} new offers imported, {count_updated} offers updated."
+                f"Import finished. {totals['inserted']} new offers imported, "
+                f"{totals['changed']} changed, {totals['unchanged']} unchanged, "
+                f"{disappeared} disappeared."
             )
         )
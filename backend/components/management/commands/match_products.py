@@ -1,14 +1,8 @@
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand
+from django.db.models import Max
+from components.matching import SHARD_CATEGORIES, match_fingerprint, match_shard
 from components.models import Component, RetailerComponentOffer
-from rapidfuzz import fuzz, process
-import re
-
-
-def normalize_model_string(model):
-    # Remove spaces and convert to uppercase for comparison
-    if model:
-        return re.sub(r"\s+", "", model).upper()
-    return ""
 
 
 class Command(BaseCommand):
@@ -26,90 +20,186 @@ class Command(BaseCommand):
             default=85,
             help="Minimum fuzzy match score (0-100, default=85)",
         )
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            help="Score all unmatched offers at once with rapidfuzz.process.cdist",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=-1,
+            help="Threads used by cdist in --batch mode (-1 = all cores, default; 1 per shard with --jobs)",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Shard offers by category and match each shard in its own process (default=1)",
+        )
+        parser.add_argument(
+            "--rescore-all",
+            action="store_true",
+            help="Score every unmatched offer, ignoring the state saved by previous runs",
+        )
+        parser.add_argument(
+            "--summary",
+            action="store_true",
+            help="Only print the final summary instead of one line per offer",
+        )
 
     def handle(self, *args, **options):
         threshold = options["threshold"]
-        category = options["category"]
+        jobs = options["jobs"]
+        self.verbose = not options["summary"]
 
-        qs = RetailerComponentOffer.objects.filter(component__isnull=True)
-        if category:
-            qs = qs.filter(category__iexact=category)
-        offers = list(qs)
-        if not offers:
-            self.stdout.write(self.style.WARNING("No unmatched retailer offers found."))
+        # Each shard is (label, components queryset, offers queryset)
+        if jobs > 1:
+            shards = self.category_shards(options["category"])
+            workers = 1 if options["workers"] == -1 else options["workers"]
+        else:
+            shards = [self.single_shard(options["category"])]
+            workers = options["workers"]
+
+        # Versioned per component category, as scrape_offers does, so the
+        # saved state means the same whichever mode or command wrote it
+        versions = self.catalog_versions()
+        offers_by_id = {}
+        tasks = []
+        skipped = 0
+        for label, components, qs in shards:
+            shard_offers = []
+            for offer in qs:
+                component_category = SHARD_CATEGORIES.get(offer.category, offer.category)
+                catalog_version = versions.get(component_category.lower(), 0)
+                fingerprint = match_fingerprint(offer.retailer_name, offer.model_name)
+                if (
+                    not options["rescore_all"]
+                    and offer.match_fingerprint == fingerprint
+                    and offer.match_catalog_version == catalog_version
+                    and offer.match_score is not None
+                    and offer.match_score < threshold
+                ):
+                    skipped += 1
+                    continue
+                offer.match_fingerprint = fingerprint
+                offer.match_catalog_version = catalog_version
+                offers_by_id[offer.id] = offer
+                shard_offers.append((offer.id, offer.retailer_name, offer.model_name))
+
+            if shard_offers:
+                tasks.append(
+                    (
+                        label,
+                        list(components.values_list("id", "name", "brand")),
+                        shard_offers,
+                        threshold,
+                        options["batch"],
+                        workers,
+                    )
+                )
+
+        if not tasks:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No unmatched retailer offers found ({skipped} unchanged since the last run skipped)."
+                )
+            )
             return
 
-        if category:
-            components = Component.objects.filter(category__name__iexact=category)
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                shard_results = list(executor.map(match_shard, *zip(*tasks)))
         else:
-            components = Component.objects.all()
-        component_lookup = [
-            (comp.id, comp.name, (comp.brand or "")) for comp in components
-        ]
-
-        matched, unmatched = 0, 0
-
-        for offer in offers:
-            # -- MODEL NAME EXACT MATCH --
-            model = offer.model_name
-            matched_id = None
-            if model:
-                norm_model = normalize_model_string(model)
-                for cid, name, brand in component_lookup:
-                    # Normalize each word in the component name for comparison
-                    name_words = re.findall(r"\w+", name)
-                    for word in name_words:
-                        if norm_model and norm_model == normalize_model_string(word):
-                            matched_id = cid
-                            offer.component_id = matched_id
-                            offer.save()
-                            matched += 1
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f"EXACT MODEL MATCH: {offer.retailer_name} ({model}) --> {name} [EXACT]"
-                                )
-                            )
-                            break
-                    if matched_id:
-                        break
-            # -- FALLBACK TO FUZZY MATCH --
-            if not matched_id:
-                # Try to filter candidates by brand if present
-                candidates = [
-                    (cid, name)
-                    for cid, name, brand in component_lookup
-                    if not offer.retailer_name
-                    or (brand and brand.lower() in offer.retailer_name.lower())
-                ]
-                if not candidates:
-                    candidates = [(cid, name) for cid, name, _ in component_lookup]
-
-                results = process.extractOne(
-                    offer.retailer_name,
-                    [name for cid, name in candidates],
-                    scorer=fuzz.token_set_ratio,
-                )
-                if results and results[1] >= threshold:
-                    idx = results[2]
-                    matched_id = candidates[idx][0]
-                    offer.component_id = matched_id
-                    offer.save()
-                    matched += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"FUZZY MATCH: {offer.retailer_name} --> {components.get(id=matched_id).name} [{results[1]}]"
-                        )
+            shard_results = [match_shard(*task) for task in tasks]
+
+        matched_offers, unmatched_offers = [], []
+        for label, results, seconds in shard_results:
+            for offer_id, component_id, component_name, score, exact in results:
+                offer = offers_by_id[offer_id]
+                offer.match_score = score if score is not None else 0
+                if exact:
+                    offer.component_id = component_id
+                    matched_offers.append(offer)
+                    self.log(
+                        self.style.SUCCESS,
+                        f"EXACT MODEL MATCH: {offer.retailer_name} ({offer.model_name}) --> {component_name} [EXACT]",
+                    )
+                elif component_id:
+                    offer.component_id = component_id
+                    matched_offers.append(offer)
+                    self.log(
+                        self.style.SUCCESS,
+                        f"FUZZY MATCH: {offer.retailer_name} --> {component_name} [{score}]",
                     )
                 else:
-                    unmatched += 1
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"Unmatched: {offer.retailer_name} [Score: {results[1] if results else 'N/A'}]"
-                        )
+                    unmatched_offers.append(offer)
+                    self.log(
+                        self.style.WARNING,
+                        f"Unmatched: {offer.retailer_name} [Score: {score if score is not None else 'N/A'}]",
                     )
+            if jobs > 1:
+                self.stdout.write(
+                    f"Shard {label}: {len(results)} offers in {seconds:.2f}s"
+                )
+
+        RetailerComponentOffer.objects.bulk_update(
+            matched_offers + unmatched_offers,
+            ["component", "match_fingerprint", "match_score", "match_catalog_version"],
+            batch_size=1000,
+        )
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Done! Matched: {matched}, Unmatched: {unmatched} (Threshold={threshold})"
+                f"Done! Matched: {len(matched_offers)}, Unmatched: {len(unmatched_offers)}, "
+                f"Skipped: {skipped} (Threshold={threshold})"
             )
         )
+
+    @staticmethod
+    def catalog_versions():
+        """Catalog version of each component category, by lowercased name
+
+        Components are only ever added by import, so a category's highest id
+        changes whenever new candidates appear in it.
+        """
+        rows = (
+            Component.objects.order_by()
+            .values("category__name")
+            .annotate(version=Max("id"))
+        )
+        return {row["category__name"].lower(): row["version"] for row in rows}
+
+    @staticmethod
+    def single_shard(category):
+        qs = RetailerComponentOffer.objects.filter(component__isnull=True)
+        if category:
+            qs = qs.filter(category__iexact=category)
+            components = Component.objects.filter(category__name__iexact=category)
+        else:
+            components = Component.objects.all()
+        return category or "all", components, qs
+
+    @staticmethod
+    def category_shards(category):
+        """One shard per scraped offer category, matched within its component category"""
+        unmatched = RetailerComponentOffer.objects.filter(component__isnull=True)
+        if category:
+            unmatched = unmatched.filter(category__iexact=category)
+        offer_categories = unmatched.values_list("category", flat=True).distinct()
+
+        shards = []
+        for offer_category in sorted(offer_categories):
+            component_category = SHARD_CATEGORIES.get(offer_category, offer_category)
+            shards.append(
+                (
+                    offer_category,
+                    Component.objects.filter(category__name__iexact=component_category),
+                    unmatched.filter(category=offer_category),
+                )
+            )
+        return shards
+
+    def log(self, style, message):
+        if self.verbose:
+            self.stdout.write(style(message))
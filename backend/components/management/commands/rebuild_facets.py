@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from components.facets import rebuild_facet_index
+from components.models import ComponentCategory
+
+
+class Command(BaseCommand):
+    help = "Rebuild the cached filter facet index of component categories"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category",
+            type=str,
+            help="Category to rebuild (e.g. CPU, Memory). If not set, rebuilds all.",
+        )
+
+    def handle(self, *args, **options):
+        categories = ComponentCategory.objects.all()
+        if options["category"]:
+            categories = categories.filter(name__iexact=options["category"])
+
+        for category in categories:
+            index = rebuild_facet_index(category)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Rebuilt facets for {category.name} ({index.component_count} components)"
+                )
+            )
@@ -0,0 +1,293 @@
+import asyncio
+import queue
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from components.matching import (
+    SHARD_CATEGORIES,
+    ComponentIndex,
+    match_fingerprint,
+    match_offers,
+)
+from components.models import Component, RetailerComponentOffer
+from components.offers import build_offer, upsert_offers
+
+SCRAPER_DIR = settings.BASE_DIR.parent / "scraper"
+
+# Marks the end of the crawl on the offer queue
+DONE = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Scrape retailers and write offers straight to the database in batches, "
+        "matching new and changed offers as they arrive"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sites",
+            nargs="+",
+            choices=["startech", "ryans"],
+            default=["startech"],
+            help="Retailers to scrape (default: startech)",
+        )
+        parser.add_argument("--max-pages", type=int, default=5)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Offers written per upsert (default=200)",
+        )
+        parser.add_argument(
+            "--flush-interval",
+            type=float,
+            default=30,
+            help="Seconds after which a partial batch is written anyway (default=30)",
+        )
+        parser.add_argument(
+            "--queue-size",
+            type=int,
+            default=1000,
+            help="Scraped offers buffered ahead of the database before scraping waits",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=int,
+            default=85,
+            help="Minimum fuzzy match score (0-100, default=85)",
+        )
+        parser.add_argument(
+            "--no-match",
+            action="store_true",
+            help="Only write offers; leave matching to match_products",
+        )
+        parser.add_argument(
+            "--cache-dir",
+            help="Response cache directory for conditional requests (default: none)",
+        )
+        parser.add_argument(
+            "--detail-ttl",
+            type=int,
+            help="Seconds a cached detail page is used without revalidation "
+            "(default: one week)",
+        )
+        parser.add_argument(
+            "--budget",
+            type=int,
+            help="Send at most this many requests, listing and detail pages "
+            "alike, taking the most volatile and stale listings first per the "
+            "crawl schedule",
+        )
+        parser.add_argument(
+            "--schedule",
+            default=str(SCRAPER_DIR / "data" / "crawl_schedule.json"),
+            help="Per-page crawl history used with --budget",
+        )
+
+    def handle(self, *args, **options):
+        if str(SCRAPER_DIR) not in sys.path:
+            sys.path.insert(0, str(SCRAPER_DIR))
+        from crawl import get_adapters
+        from crawl_engine import AsyncCrawler
+        from crawl_schedule import CrawlSchedule
+        from http_cache import ResponseCache
+        from startech_scraper import DETAIL_TTL
+
+        offers = queue.Queue(maxsize=options["queue_size"])
+        # Set when writing fails, so the scraper stops instead of waiting on
+        # a queue nobody reads
+        stop = threading.Event()
+
+        def hand_over(item):
+            while not stop.is_set():
+                try:
+                    offers.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        class QueueCrawler(AsyncCrawler):
+            # Waits while the queue is full, so scraping never runs further
+            # ahead of the database than queue_size offers. The blocking put
+            # runs in a thread: requests in flight carry on meanwhile.
+            async def on_item(self, item):
+                await asyncio.get_running_loop().run_in_executor(None, hand_over, item)
+
+        detail_ttl = options["detail_ttl"]
+        crawler = QueueCrawler(
+            get_adapters(options["sites"]),
+            max_pages=options["max_pages"],
+            cache=ResponseCache(options["cache_dir"]) if options["cache_dir"] else None,
+            detail_ttl=DETAIL_TTL if detail_ttl is None else detail_ttl,
+            schedule=(
+                CrawlSchedule(options["schedule"])
+                if options["budget"] is not None
+                else None
+            ),
+            budget=options["budget"],
+        )
+        failure = []
+
+        async def crawl():
+            task = asyncio.create_task(crawler.run())
+            while not task.done():
+                if stop.is_set():
+                    task.cancel()
+                await asyncio.wait([task], timeout=1)
+            if not task.cancelled():
+                task.result()
+
+        def scrape():
+            try:
+                asyncio.run(crawl())
+            except Exception as e:
+                failure.append(e)
+            finally:
+                hand_over(DONE)
+
+        self.threshold = options["threshold"]
+        self.match = not options["no_match"]
+        self.indexes = {}
+        self.totals = Counter()
+
+        started = time.perf_counter()
+        thread = threading.Thread(target=scrape, name="scraper", daemon=True)
+        thread.start()
+        try:
+            for number, batch in enumerate(
+                self.batches(offers, options["batch_size"], options["flush_interval"]),
+                start=1,
+            ):
+                self.write_batch(number, batch)
+        except BaseException:
+            stop.set()
+            thread.join()
+            raise
+        thread.join()
+        if failure:
+            raise CommandError(f"Scraping failed: {failure[0]}")
+
+        elapsed = time.perf_counter() - started
+        totals = self.totals
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Pipeline finished in {elapsed:.1f}s. {totals['inserted']} new "
+                f"offers, {totals['changed']} changed, {totals['unchanged']} unchanged, "
+                f"{totals['matched']} matched."
+            )
+        )
+
+    @staticmethod
+    def batches(offers, batch_size, flush_interval):
+        """Group queued items into batches of batch_size, or whatever arrived
+        within flush_interval seconds of a batch's first item"""
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                item = offers.get(timeout=timeout)
+            except queue.Empty:
+                yield batch
+                batch, deadline = [], None
+                continue
+            if item is DONE:
+                if batch:
+                    yield batch
+                return
+            if not batch:
+                deadline = time.monotonic() + flush_interval
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch, deadline = [], None
+
+    def write_batch(self, number, batch):
+        started = time.perf_counter()
+        by_retailer = defaultdict(dict)
+        for item in batch:
+            offer = build_offer(item)
+            by_retailer[offer.retailer][offer.url] = offer
+
+        result = Counter()
+        for retailer, offers in by_retailer.items():
+            with transaction.atomic():
+                written = upsert_offers(retailer, list(offers.values()))
+            if self.match and (written["inserted"] or written["changed"]):
+                written["matched"] = self.match_batch(retailer, list(offers))
+            result.update(written)
+
+        self.totals.update(result)
+        self.stdout.write(
+            f"Batch {number}: {len(batch)} offers, {result['inserted']} new, "
+            f"{result['changed']} changed, {result['matched']} matched "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    def match_batch(self, retailer, urls):
+        """Match the unmatched offers among urls whose match inputs changed"""
+        unmatched = RetailerComponentOffer.objects.filter(
+            retailer=retailer, url__in=urls, component__isnull=True
+        )
+        by_category = defaultdict(list)
+        for offer in unmatched:
+            by_category[offer.category].append(offer)
+
+        to_update = []
+        matched = 0
+        for offer_category, offers in by_category.items():
+            index, catalog_version = self.get_index(offer_category)
+            pending = []
+            for offer in offers:
+                fingerprint = match_fingerprint(offer.retailer_name, offer.model_name)
+                if (
+                    offer.match_fingerprint == fingerprint
+                    and offer.match_catalog_version == catalog_version
+                    and offer.match_score is not None
+                    and offer.match_score < self.threshold
+                ):
+                    continue
+                offer.match_fingerprint = fingerprint
+                offer.match_catalog_version = catalog_version
+                pending.append(offer)
+            if not pending:
+                continue
+
+            offers_by_id = {offer.id: offer for offer in pending}
+            results = match_offers(
+                None,
+                [(o.id, o.retailer_name, o.model_name) for o in pending],
+                self.threshold,
+                index=index,
+            )
+            for offer_id, component_id, _, score, _ in results:
+                offer = offers_by_id[offer_id]
+                offer.match_score = score if score is not None else 0
+                if component_id:
+                    offer.component_id = component_id
+                    matched += 1
+                to_update.append(offer)
+
+        RetailerComponentOffer.objects.bulk_update(
+            to_update,
+            ["component", "match_fingerprint", "match_score", "match_catalog_version"],
+        )
+        return matched
+
+    def get_index(self, offer_category):
+        """ComponentIndex and catalog version of a category, built once per run"""
+        component_category = SHARD_CATEGORIES.get(offer_category, offer_category)
+        if component_category not in self.indexes:
+            components = Component.objects.filter(
+                category__name__iexact=component_category
+            )
+            version = components.aggregate(version=Max("id"))["version"] or 0
+            index = ComponentIndex(components.values_list("id", "name", "brand"))
+            self.indexes[component_category] = (index, version)
+        return self.indexes[component_category]
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import re
+import time
+from collections import defaultdict
+
+from rapidfuzz import fuzz, process
+
+WORD_RE = re.compile(r"\w+")
+
+# Tokens shared by more components than this are too common to block on
+MAX_TOKEN_BLOCK = 500
+
+# Offer category (as scraped) -> component category it is matched against
+SHARD_CATEGORIES = {
+    "CPU": "CPU",
+    "RAM": "Memory",
+    "Memory": "Memory",
+    "Monitor": "Monitor",
+    "GPU": "GPU",
+    "Motherboard": "Motherboard",
+}
+
+
+def normalize_model_string(model):
+    # Remove spaces and convert to uppercase for comparison
+    if model:
+        return re.sub(r"\s+", "", model).upper()
+    return ""
+
+
+def match_fingerprint(retailer_name, model_name):
+    """Hash of the offer fields that matching depends on"""
+    content = json.dumps([retailer_name, model_name])
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def tokenize(text):
+    return {word.lower() for word in WORD_RE.findall(text or "")}
+
+
+class ComponentIndex:
+    """Lookup structures over the component catalog, built once per matching run
+
+    - models: normalized name word -> first component id containing it, so an
+      exact model match is a dictionary lookup
+    - brands: lowercased brand -> component positions
+    - brand_words: first word of a lowercased brand -> the brands starting
+      with it, so finding the brands named in an offer costs a lookup per
+      word of its name rather than a scan of every brand
+    - tokens: lowercased name word -> component positions, used to block
+      fuzzy matching to components sharing at least one uncommon word
+    """
+
+    def __init__(self, components):
+        self.ids = []
+        self.names = []
+        self.positions = {}
+        self.models = {}
+        self.brands = defaultdict(list)
+        self.brand_words = defaultdict(set)
+        self.tokens = defaultdict(list)
+
+        for position, (cid, name, brand) in enumerate(components):
+            self.ids.append(cid)
+            self.names.append(name)
+            self.positions[cid] = position
+            for word in WORD_RE.findall(name):
+                self.models.setdefault(normalize_model_string(word), cid)
+            if brand:
+                self.brands[brand.lower()].append(position)
+                words = WORD_RE.findall(brand.lower())
+                if words:
+                    self.brand_words[words[0]].add(brand.lower())
+            for token in tokenize(name):
+                self.tokens[token].append(position)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def name_of(self, cid):
+        return self.names[self.positions[cid]]
+
+    def match_model(self, model):
+        """Return the component whose name contains the offer model as a word"""
+        norm_model = normalize_model_string(model)
+        if not norm_model:
+            return None
+        return self.models.get(norm_model)
+
+    def candidates(self, retailer_name):
+        """Positions of the components worth fuzzy-scoring against an offer name"""
+        return self.blocks(retailer_name)[1]
+
+    def blocks(self, retailer_name):
+        """Return the brands named in an offer and its candidate component positions
+
+        Components of a brand mentioned in the offer name are narrowed to those
+        sharing an uncommon word with it; without a brand, the word blocks alone
+        are used.
+        """
+        lowered = (retailer_name or "").lower()
+        brands = set()
+        for word in set(WORD_RE.findall(lowered)):
+            for brand in self.brand_words.get(word, ()):
+                # Multi-word brands ("western digital") must appear whole
+                if brand in lowered:
+                    brands.add(brand)
+        by_brand = set()
+        for brand in brands:
+            by_brand.update(self.brands[brand])
+
+        by_token = set()
+        for token in tokenize(retailer_name):
+            positions = self.tokens.get(token)
+            if positions and len(positions) <= MAX_TOKEN_BLOCK:
+                by_token.update(positions)
+
+        if by_brand and by_token:
+            candidates = by_brand & by_token or by_brand
+        else:
+            candidates = by_brand or by_token
+        return tuple(sorted(brands)), sorted(candidates)
+
+
+def best_match(index, retailer_name, candidates=None):
+    """Score one offer name against its candidates; returns (position, score)"""
+    if candidates is None:
+        candidates = index.candidates(retailer_name)
+    result = process.extractOne(
+        retailer_name,
+        [index.names[position] for position in candidates],
+        scorer=fuzz.token_set_ratio,
+    )
+    if not result:
+        return None, None
+    return candidates[result[2]], result[1]
+
+
+def best_matches(index, retailer_names, workers=-1, chunk_size=1000):
+    """Score many offer names at once; returns (position, score) pairs equal to best_match()
+
+    Each distinct name is blocked and scored once, however many offers
+    carry it. Distinct names with the same candidate components are scored
+    together with one process.cdist matrix of exactly those candidates,
+    chunk_size rows at a time, spread over workers threads; no pair is
+    scored that best_match() would not score. Names with candidates of
+    their own go through best_match(), where a matrix only adds overhead.
+    """
+    rows_of = defaultdict(list)
+    for row, name in enumerate(retailer_names):
+        rows_of[name].append(row)
+
+    groups = defaultdict(list)
+    for name in rows_of:
+        candidates = index.candidates(name)
+        if candidates:
+            groups[tuple(candidates)].append(name)
+
+    scored = {}
+    for candidates, names in groups.items():
+        if len(names) == 1:
+            scored[names[0]] = best_match(index, names[0], candidates)
+            continue
+        choices = [index.names[position] for position in candidates]
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start : start + chunk_size]
+            scores = process.cdist(chunk, choices, scorer=fuzz.token_set_ratio, workers=workers)
+            for matrix_row, name in enumerate(chunk):
+                best = int(scores[matrix_row].argmax())
+                scored[name] = (candidates[best], float(scores[matrix_row, best]))
+
+    results = [(None, None)] * len(retailer_names)
+    for name, rows in rows_of.items():
+        for row in rows:
+            results[row] = scored.get(name, (None, None))
+    return results
+
+
+def match_offers(components, offers, threshold, batch=False, workers=-1, index=None):
+    """Match offers to components, exact model match first, then fuzzy
+
+    components are (id, name, brand) and offers (id, retailer_name, model_name)
+    tuples, so this can run in a worker process without database access.
+    A ComponentIndex already built over the components can be passed as index.
+    Returns (offer_id, component_id, component_name, score, exact) tuples,
+    with component_id None when the best score is below the threshold.
+    """
+    if index is None:
+        index = ComponentIndex(components)
+    results = []
+
+    # -- MODEL NAME EXACT MATCH --
+    pending = []
+    for offer_id, retailer_name, model_name in offers:
+        matched_id = index.match_model(model_name) if model_name else None
+        if matched_id:
+            results.append((offer_id, matched_id, index.name_of(matched_id), 100, True))
+        else:
+            pending.append((offer_id, retailer_name))
+
+    # -- FALLBACK TO FUZZY MATCH --
+    names = [retailer_name for _, retailer_name in pending]
+    if batch:
+        scored = best_matches(index, names, workers=workers)
+    else:
+        scored = [best_match(index, name) for name in names]
+
+    for (offer_id, _), (position, score) in zip(pending, scored):
+        if score is not None and score >= threshold:
+            cid = index.ids[position]
+            results.append((offer_id, cid, index.names[position], score, False))
+        else:
+            results.append((offer_id, None, None, score, False))
+    return results
+
+
+def match_shard(label, components, offers, threshold, batch=False, workers=-1):
+    """match_offers() for one shard, returning (label, results, seconds)"""
+    started = time.perf_counter()
+    results = match_offers(components, offers, threshold, batch=batch, workers=workers)
+    return label, results, time.perf_counter() - started
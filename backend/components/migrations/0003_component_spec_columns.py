@@ -0,0 +1,266 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:44
+
+import re
+
+from django.db import migrations, models
+
+# The spec parsers as of this migration, copied from components.specs so
+# that later changes to that module do not change what this migration does
+
+SPEC_COLUMNS = [
+    "core_count",
+    "base_clock_ghz",
+    "boost_clock_ghz",
+    "l3_cache_mb",
+    "graphics",
+    "capacity_gb",
+    "memory_type",
+    "speed_mhz",
+    "screen_size_in",
+    "resolution",
+    "refresh_rate_hz",
+    "panel_type",
+]
+
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def parse_number(value):
+    """Return the first number found in values like 8, "3.6 GHz" or '27"'"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_RE.search(str(value).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def as_int(value):
+    number = parse_number(value)
+    return int(number) if number is not None else None
+
+
+def parse_frequency_ghz(value):
+    """Normalize "3600 MHz", "3.6 GHz" or 3.6 to GHz"""
+    number = parse_number(value)
+    if number is None:
+        return None
+    if "mhz" in str(value).lower():
+        number = number / 1000
+    return round(number, 3)
+
+
+def parse_size_mb(value):
+    """Normalize "32 MB", "1 GB" or 32 to MB"""
+    number = parse_number(value)
+    if number is None:
+        return None
+    if "gb" in str(value).lower():
+        number = number * 1024
+    return number
+
+
+def parse_capacity_gb(value):
+    """Normalize "16 GB", "512 MB" or a [modules, size_gb] pair to GB"""
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2 and all(parse_number(v) is not None for v in value):
+            return int(parse_number(value[0]) * parse_number(value[1]))
+        return None
+    number = parse_number(value)
+    if number is None:
+        return None
+    if "mb" in str(value).lower():
+        number = number / 1024
+    return int(number)
+
+
+def parse_memory_speed(value):
+    """Return (generation, MHz) from "3200 MHz" or a [ddr_generation, MHz] pair"""
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2:
+            return as_int(value[0]), as_int(value[1])
+        return None, None
+    return None, as_int(value)
+
+
+def parse_resolution(value):
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2:
+            return f"{value[0]}x{value[1]}"
+        return None
+    return str(value) if value else None
+
+
+def as_text(value):
+    return str(value) if value else None
+
+
+def normalize_cpu(specs):
+    return {
+        "core_count": as_int(specs.get("core_count")),
+        "base_clock_ghz": parse_frequency_ghz(
+            specs.get("base_clock") or specs.get("core_clock")
+        ),
+        "boost_clock_ghz": parse_frequency_ghz(specs.get("boost_clock")),
+        "l3_cache_mb": parse_size_mb(specs.get("l3_cache")),
+        "graphics": as_text(specs.get("graphics")),
+    }
+
+
+def normalize_memory(specs):
+    generation, speed = parse_memory_speed(specs.get("speed"))
+    memory_type = as_text(specs.get("type"))
+    if not memory_type and generation:
+        memory_type = f"DDR{generation}"
+    return {
+        "capacity_gb": parse_capacity_gb(
+            specs.get("capacity") or specs.get("modules")
+        ),
+        "memory_type": memory_type,
+        "speed_mhz": speed,
+    }
+
+
+def normalize_monitor(specs):
+    return {
+        "screen_size_in": parse_number(specs.get("screen_size")),
+        "resolution": parse_resolution(specs.get("resolution")),
+        "refresh_rate_hz": as_int(specs.get("refresh_rate")),
+        "panel_type": as_text(specs.get("panel_type")),
+    }
+
+
+NORMALIZERS = {
+    "CPU": normalize_cpu,
+    "MEMORY": normalize_memory,
+    "MONITOR": normalize_monitor,
+}
+
+
+def normalize_specs(category_name, specs):
+    """Parse the free-form specs of a component into typed values for its category"""
+    normalizer = NORMALIZERS.get((category_name or "").upper())
+    if not normalizer or not isinstance(specs, dict):
+        return {}
+    return normalizer(specs)
+
+
+def backfill_spec_columns(apps, schema_editor):
+    Component = apps.get_model("components", "Component")
+    batch = []
+    for component in Component.objects.select_related("category").iterator():
+        normalized = normalize_specs(component.category.name, component.specs)
+        for field in SPEC_COLUMNS:
+            value = normalized.get(field)
+            if isinstance(value, str):
+                value = value[: Component._meta.get_field(field).max_length]
+            setattr(component, field, value)
+        batch.append(component)
+        if len(batch) >= 1000:
+            Component.objects.bulk_update(batch, SPEC_COLUMNS)
+            batch = []
+    if batch:
+        Component.objects.bulk_update(batch, SPEC_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0002_categoryfacetindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='base_clock_ghz',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='boost_clock_ghz',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='capacity_gb',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='core_count',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='graphics',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='l3_cache_mb',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='memory_type',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='panel_type',
+            field=models.CharField(blank=True, max_length=30, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='refresh_rate_hz',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='resolution',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='screen_size_in',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='speed_mhz',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'core_count'], name='comp_core_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'base_clock_ghz'], name='comp_base_clock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'boost_clock_ghz'], name='comp_boost_clock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'l3_cache_mb'], name='comp_l3_cache_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'capacity_gb'], name='comp_capacity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'speed_mhz'], name='comp_speed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'screen_size_in'], name='comp_screen_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'refresh_rate_hz'], name='comp_refresh_rate_idx'),
+        ),
+        migrations.RunPython(backfill_spec_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:46
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_offers(apps, schema_editor):
+    """Keep only the most recently imported offer per (retailer, url)"""
+    RetailerComponentOffer = apps.get_model("components", "RetailerComponentOffer")
+    duplicates = (
+        RetailerComponentOffer.objects.values("retailer", "url")
+        .annotate(keep_id=Max("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        RetailerComponentOffer.objects.filter(
+            retailer=duplicate["retailer"], url=duplicate["url"]
+        ).exclude(id=duplicate["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0003_component_spec_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_offers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='retailercomponentoffer',
+            constraint=models.UniqueConstraint(fields=('retailer', 'url'), name='unique_retailer_offer_url'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0004_unique_retailer_offer_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='retailercomponentoffer',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=40, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0005_retailercomponentoffer_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferPriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('availability', models.BooleanField(default=True)),
+                ('observed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('offer', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='components.retailercomponentoffer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['offer', 'observed_at'], name='offer_price_history_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0006_offerpricehistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='retailercomponentoffer',
+            name='match_catalog_version',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='retailercomponentoffer',
+            name='match_fingerprint',
+            field=models.CharField(blank=True, max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='retailercomponentoffer',
+            name='match_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
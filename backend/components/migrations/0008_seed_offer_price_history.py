@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def seed_price_history(apps, schema_editor):
+    """One observation per offer without history, so prices that never
+    move after this point still appear in the history"""
+    OfferPriceHistory = apps.get_model('components', 'OfferPriceHistory')
+    RetailerComponentOffer = apps.get_model('components', 'RetailerComponentOffer')
+    observed_at = timezone.now()
+    offers = RetailerComponentOffer.objects.filter(price_history__isnull=True).values_list(
+        'pk', 'price', 'availability'
+    )
+    OfferPriceHistory.objects.bulk_create(
+        [
+            OfferPriceHistory(
+                offer_id=pk, price=price, availability=availability, observed_at=observed_at
+            )
+            for pk, price, availability in offers.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0007_offer_match_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_price_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def clear_sub_gb_capacities(apps, schema_editor):
+    """Capacities under 1 GB were truncated to 0 GB; they are unknown instead"""
+    Component = apps.get_model('components', 'Component')
+    Component.objects.filter(capacity_gb=0).update(capacity_gb=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0008_seed_offer_price_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_sub_gb_capacities, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils import timezone
+
+from .specs import SPEC_COLUMNS, normalize_specs
 
 
 class ComponentCategory(models.Model):
@@ -21,9 +24,51 @@ class Component(models.Model):
         default=dict, blank=True
     )  # Store arbitrary key-value pairs from the dataset
 
+    # Typed values parsed from specs on save, used for indexed range filters
+    core_count = models.PositiveSmallIntegerField(blank=True, null=True)
+    base_clock_ghz = models.FloatField(blank=True, null=True)
+    boost_clock_ghz = models.FloatField(blank=True, null=True)
+    l3_cache_mb = models.FloatField(blank=True, null=True)
+    graphics = models.CharField(max_length=100, blank=True, null=True)
+    capacity_gb = models.PositiveIntegerField(blank=True, null=True)
+    memory_type = models.CharField(max_length=20, blank=True, null=True)
+    speed_mhz = models.PositiveIntegerField(blank=True, null=True)
+    screen_size_in = models.FloatField(blank=True, null=True)
+    resolution = models.CharField(max_length=20, blank=True, null=True)
+    refresh_rate_hz = models.PositiveSmallIntegerField(blank=True, null=True)
+    panel_type = models.CharField(max_length=30, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["category", "core_count"], name="comp_core_count_idx"),
+            models.Index(fields=["category", "base_clock_ghz"], name="comp_base_clock_idx"),
+            models.Index(fields=["category", "boost_clock_ghz"], name="comp_boost_clock_idx"),
+            models.Index(fields=["category", "l3_cache_mb"], name="comp_l3_cache_idx"),
+            models.Index(fields=["category", "capacity_gb"], name="comp_capacity_idx"),
+            models.Index(fields=["category", "speed_mhz"], name="comp_speed_idx"),
+            models.Index(fields=["category", "screen_size_in"], name="comp_screen_size_idx"),
+            models.Index(fields=["category", "refresh_rate_hz"], name="comp_refresh_rate_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.brand})"
 
+    def apply_normalized_specs(self):
+        """Copy the typed values parsed from specs onto the spec columns"""
+        normalized = normalize_specs(self.category.name, self.specs)
+        for field in SPEC_COLUMNS:
+            value = normalized.get(field)
+            if isinstance(value, str):
+                value = value[: self._meta.get_field(field).max_length]
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.apply_normalized_specs()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"specs", "category"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, *SPEC_COLUMNS}
+        super().save(*args, **kwargs)
+
 
 class RetailerComponentOffer(models.Model):
     component = models.ForeignKey(
@@ -41,3 +86,53 @@ class RetailerComponentOffer(models.Model):
     image_url = models.URLField(blank=True, null=True)
     availability = models.BooleanField(default=True)
     category = models.CharField(max_length=50)
+    # SHA-1 of the scraped fields, compared on import to skip unchanged offers
+    content_hash = models.CharField(max_length=40, blank=True, null=True)
+    # State of the last match_products run, used to skip offers that cannot
+    # match until their name/model or the component catalog changes
+    match_fingerprint = models.CharField(max_length=40, blank=True, null=True)
+    match_score = models.FloatField(blank=True, null=True)
+    match_catalog_version = models.PositiveBigIntegerField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["retailer", "url"], name="unique_retailer_offer_url"
+            )
+        ]
+
+
+class CategoryFacetIndex(models.Model):
+    category = models.OneToOneField(
+        ComponentCategory, on_delete=models.CASCADE, related_name="facet_index"
+    )
+    # Distinct manufacturers and normalized spec values offered as filters
+    facets = models.JSONField(default=dict, blank=True)
+    component_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Facets for {self.category.name}"
+
+
+class OfferPriceHistory(models.Model):
+    """Price observations of an offer, appended by the importer only on change"""
+
+    # Covered by the (offer, observed_at) index below
+    offer = models.ForeignKey(
+        RetailerComponentOffer,
+        on_delete=models.CASCADE,
+        related_name="price_history",
+        db_index=False,
+    )
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    availability = models.BooleanField(default=True)
+    observed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["offer", "observed_at"], name="offer_price_history_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.offer_id} @ {self.observed_at:%Y-%m-%d}: {self.price}"
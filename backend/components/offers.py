@@ -0,0 +1,187 @@
+import hashlib
+import json
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import OfferPriceHistory, RetailerComponentOffer
+
+# Natural key of an offer, backed by a unique constraint
+OFFER_KEY_FIELDS = ["retailer", "url"]
+OFFER_UPDATE_FIELDS = [
+    "retailer_name",
+    "price",
+    "image_url",
+    "availability",
+    "category",
+    "model_name",
+    "content_hash",
+]
+
+
+def parse_availability(val):
+    """Convert 'Out of Stock' and similar to boolean False, otherwise True."""
+    if isinstance(val, bool):
+        return val
+    if val is None:
+        return True  # Default to True if not specified
+    val = str(val).strip().lower()
+    return val in ["true", "1", "in stock", "available", "yes"]
+
+
+def normalize_price(price):
+    if price is None or price == "":
+        return None
+    try:
+        return Decimal(str(price)).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+
+def offer_content_hash(offer):
+    """Fingerprint of the scraped fields, used to skip rewriting unchanged offers"""
+    content = [
+        str(offer.price) if offer.price is not None else None,
+        offer.availability,
+        offer.image_url,
+        offer.model_name,
+        offer.retailer_name,
+        offer.category,
+    ]
+    return hashlib.sha1(json.dumps(content).encode("utf-8")).hexdigest()
+
+
+def build_offer(item):
+    offer = RetailerComponentOffer(
+        retailer=item["retailer"],
+        retailer_name=item["retailer_name"],
+        url=item["url"],
+        price=normalize_price(item.get("price")),
+        image_url=item.get("image_url"),
+        availability=parse_availability(item.get("availability")),
+        category=item.get("category", "Unknown"),
+        model_name=item.get("model"),
+    )
+    offer.content_hash = offer_content_hash(offer)
+    return offer
+
+
+def upsert_offers(retailer, offers):
+    """Write the new and changed offers of one retailer with one INSERT ... ON CONFLICT
+
+    Stored content hashes are fetched in bulk; offers whose hash matches are
+    left untouched, and a stored model is kept when an offer comes without
+    one. New offers and offers whose price or availability moved get a
+    price history entry. Returns a Counter of inserted, changed and
+    unchanged offers.
+    """
+    stored = {
+        url: (pk, content_hash, price, availability, model_name)
+        for pk, url, content_hash, price, availability, model_name in RetailerComponentOffer.objects.filter(
+            retailer=retailer, url__in=[offer.url for offer in offers]
+        ).values_list("pk", "url", "content_hash", "price", "availability", "model_name")
+    }
+    result = Counter()
+    to_write = []
+    price_moves = []
+    for offer in offers:
+        if offer.url not in stored:
+            result["inserted"] += 1
+            price_moves.append(offer)
+        else:
+            pk, content_hash, price, availability, model_name = stored[offer.url]
+            if offer.model_name is None and model_name:
+                # The detail page was skipped or failed this time; keep the
+                # model scraped before rather than wiping it and its match
+                offer.model_name = model_name
+                offer.content_hash = offer_content_hash(offer)
+            if content_hash == offer.content_hash:
+                result["unchanged"] += 1
+                continue
+            result["changed"] += 1
+            if price != offer.price or availability != offer.availability:
+                price_moves.append(offer)
+        to_write.append(offer)
+
+    if to_write:
+        RetailerComponentOffer.objects.bulk_create(
+            to_write,
+            update_conflicts=True,
+            unique_fields=OFFER_KEY_FIELDS,
+            update_fields=OFFER_UPDATE_FIELDS,
+        )
+    if price_moves:
+        record_price_history(retailer, price_moves)
+    return result
+
+
+def record_price_history(retailer, offers):
+    """Append one price history entry per offer, observed now"""
+    offer_ids = dict(
+        RetailerComponentOffer.objects.filter(
+            retailer=retailer, url__in=[offer.url for offer in offers]
+        ).values_list("url", "pk")
+    )
+    observed_at = timezone.now()
+    OfferPriceHistory.objects.bulk_create(
+        [
+            OfferPriceHistory(
+                offer_id=offer_ids[offer.url],
+                price=offer.price,
+                availability=offer.availability,
+                observed_at=observed_at,
+            )
+            for offer in offers
+        ]
+    )
+
+
+DAILY_PRICE_RANGE_SQL = """
+    SELECT days.day::date,
+           MIN(latest.price),
+           MAX(latest.price),
+           MIN(latest.price) FILTER (WHERE latest.availability)
+    FROM generate_series(%(start)s::date, %(end)s::date, interval '1 day') AS days (day)
+    CROSS JOIN (
+        SELECT id FROM {offers}
+        WHERE component_id = %(component)s {retailer_filter}
+    ) AS offer
+    CROSS JOIN LATERAL (
+        SELECT price, availability FROM {history}
+        WHERE offer_id = offer.id
+          AND observed_at < (days.day::date + 1)::timestamp AT TIME ZONE %(tz)s
+        ORDER BY observed_at DESC, id DESC
+        LIMIT 1
+    ) AS latest
+    WHERE latest.price IS NOT NULL
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+
+def daily_price_range(component_id, start, retailer=None):
+    """Daily price range of a component's offers from start's day until today
+
+    History is only written when a price moves, so each offer's price on a
+    day is its latest observation by the end of that day, found per offer
+    through the (offer, observed_at) index. An observation without a price
+    ends the offer's run. Returns (day, min_price, max_price,
+    min_available_price) rows, computed in the database with one row per day.
+    """
+    sql = DAILY_PRICE_RANGE_SQL.format(
+        offers=RetailerComponentOffer._meta.db_table,
+        history=OfferPriceHistory._meta.db_table,
+        retailer_filter="AND UPPER(retailer) = UPPER(%(retailer)s)" if retailer else "",
+    )
+    params = {
+        "start": timezone.localdate(start),
+        "end": timezone.localdate(),
+        "component": component_id,
+        "tz": timezone.get_current_timezone_name(),
+        "retailer": retailer,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
@@ -17,6 +17,19 @@ class ComponentSerializer(serializers.ModelSerializer):
         fields = ["id", "category", "name", "brand", "model", "specs"]
 
 
+class ComponentListSerializer(ComponentSerializer):
+    lowest_price = serializers.ReadOnlyField()
+    lowest_price_retailer = serializers.ReadOnlyField()
+    lowest_price_url = serializers.ReadOnlyField()
+
+    class Meta(ComponentSerializer.Meta):
+        fields = ComponentSerializer.Meta.fields + [
+            "lowest_price",
+            "lowest_price_retailer",
+            "lowest_price_url",
+        ]
+
+
 class RetailerComponentOfferSerializer(serializers.ModelSerializer):
     class Meta:
         model = RetailerComponentOffer
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .facets import schedule_facet_rebuild
+from .models import Component
+
+
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+def rebuild_category_facets(sender, instance, **kwargs):
+    schedule_facet_rebuild(instance.category_id)
@@ -0,0 +1,178 @@
+import re
+
+# Facet name exposed by the API -> spec column, per category
+FACET_FIELDS = {
+    "CPU": {
+        "core_counts": "core_count",
+        "base_frequencies": "base_clock_ghz",
+        "max_frequencies": "boost_clock_ghz",
+        "cache_sizes": "l3_cache_mb",
+        "graphics_options": "graphics",
+    },
+    "MEMORY": {
+        "capacities": "capacity_gb",
+        "types": "memory_type",
+        "frequencies": "speed_mhz",
+    },
+    "MONITOR": {
+        "screen_sizes": "screen_size_in",
+        "resolutions": "resolution",
+        "refresh_rates": "refresh_rate_hz",
+        "panel_types": "panel_type",
+    },
+}
+
+# Component columns filled from normalize_specs()
+SPEC_COLUMNS = [
+    "core_count",
+    "base_clock_ghz",
+    "boost_clock_ghz",
+    "l3_cache_mb",
+    "graphics",
+    "capacity_gb",
+    "memory_type",
+    "speed_mhz",
+    "screen_size_in",
+    "resolution",
+    "refresh_rate_hz",
+    "panel_type",
+]
+
+# Range filter query parameter prefix -> spec column, e.g. core_count_min=8
+RANGE_FILTERS = {
+    "core_count": "core_count",
+    "base_clock": "base_clock_ghz",
+    "boost_clock": "boost_clock_ghz",
+    "l3_cache": "l3_cache_mb",
+    "capacity": "capacity_gb",
+    "speed": "speed_mhz",
+    "screen_size": "screen_size_in",
+    "refresh_rate": "refresh_rate_hz",
+}
+
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def parse_number(value):
+    """Return the first number found in values like 8, "3.6 GHz" or '27"'"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_RE.search(str(value).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def as_int(value):
+    number = parse_number(value)
+    return int(number) if number is not None else None
+
+
+def parse_frequency_ghz(value):
+    """Normalize "3600 MHz", "3.6 GHz" or 3.6 to GHz"""
+    number = parse_number(value)
+    if number is None:
+        return None
+    if "mhz" in str(value).lower():
+        number = number / 1000
+    return round(number, 3)
+
+
+def parse_size_mb(value):
+    """Normalize "32 MB", "1 GB" or 32 to MB"""
+    number = parse_number(value)
+    if number is None:
+        return None
+    if "gb" in str(value).lower():
+        number = number * 1024
+    return number
+
+
+def parse_capacity_gb(value):
+    """Normalize "16 GB", "512 MB" or a [modules, size_gb] pair to whole GB
+
+    Capacities under 1 GB give None rather than a 0 GB part.
+    """
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2 and all(parse_number(v) is not None for v in value):
+            number = parse_number(value[0]) * parse_number(value[1])
+        else:
+            return None
+    else:
+        number = parse_number(value)
+        if number is None:
+            return None
+        if "mb" in str(value).lower():
+            number = number / 1024
+    return int(number) if number >= 1 else None
+
+
+def parse_memory_speed(value):
+    """Return (generation, MHz) from "3200 MHz" or a [ddr_generation, MHz] pair"""
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2:
+            return as_int(value[0]), as_int(value[1])
+        return None, None
+    return None, as_int(value)
+
+
+def parse_resolution(value):
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2:
+            return f"{value[0]}x{value[1]}"
+        return None
+    return str(value) if value else None
+
+
+def as_text(value):
+    return str(value) if value else None
+
+
+def normalize_cpu(specs):
+    return {
+        "core_count": as_int(specs.get("core_count")),
+        "base_clock_ghz": parse_frequency_ghz(
+            specs.get("base_clock") or specs.get("core_clock")
+        ),
+        "boost_clock_ghz": parse_frequency_ghz(specs.get("boost_clock")),
+        "l3_cache_mb": parse_size_mb(specs.get("l3_cache")),
+        "graphics": as_text(specs.get("graphics")),
+    }
+
+
+def normalize_memory(specs):
+    generation, speed = parse_memory_speed(specs.get("speed"))
+    memory_type = as_text(specs.get("type"))
+    if not memory_type and generation:
+        memory_type = f"DDR{generation}"
+    return {
+        "capacity_gb": parse_capacity_gb(
+            specs.get("capacity") or specs.get("modules")
+        ),
+        "memory_type": memory_type,
+        "speed_mhz": speed,
+    }
+
+
+def normalize_monitor(specs):
+    return {
+        "screen_size_in": parse_number(specs.get("screen_size")),
+        "resolution": parse_resolution(specs.get("resolution")),
+        "refresh_rate_hz": as_int(specs.get("refresh_rate")),
+        "panel_type": as_text(specs.get("panel_type")),
+    }
+
+
+NORMALIZERS = {
+    "CPU": normalize_cpu,
+    "MEMORY": normalize_memory,
+    "MONITOR": normalize_monitor,
+}
+
+
+def normalize_specs(category_name, specs):
+    """Parse the free-form specs of a component into typed values for its category"""
+    normalizer = NORMALIZERS.get((category_name or "").upper())
+    if not normalizer or not isinstance(specs, dict):
+        return {}
+    return normalizer(specs)
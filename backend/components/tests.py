@@ -0,0 +1,36 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Component, ComponentCategory
+
+
+class ComponentRangeFilterTests(TestCase):
+    """Spec range filters ignore values that are not usable numbers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = ComponentCategory.objects.create(name="CPU")
+        for cores in (4, 8, 16):
+            Component.objects.create(
+                category=category, name=f"Test CPU {cores} cores", brand="AMD",
+                specs={"core_count": cores},
+            )
+
+    def get_names(self, params):
+        response = APIClient().get(
+            reverse("component-list-by-category", args=["CPU"]), params
+        )
+        self.assertEqual(response.status_code, 200)
+        return sorted(component["name"] for component in response.data["results"])
+
+    def test_range(self):
+        self.assertEqual(
+            self.get_names({"core_count_min": "8", "core_count_max": "12"}),
+            ["Test CPU 8 cores"],
+        )
+
+    def test_invalid_values_are_ignored(self):
+        for value in ("inf", "-inf", "nan", "1e400", "eight"):
+            with self.subTest(value=value):
+                self.assertEqual(len(self.get_names({"core_count_min": value})), 3)
@@ -1,6 +1,6 @@
 from django.urls import path
 from . import views
-from .views import ComponentWithOffersView
+from .views import ComponentPriceHistoryView, ComponentWithOffersView
 
 urlpatterns = [
     path(
@@ -19,4 +19,9 @@ urlpatterns = [
         ComponentWithOffersView.as_view(),
         name="component-with-offers",
     ),
+    path(
+        "<int:pk>/price-history/",
+        ComponentPriceHistoryView.as_view(),
+        name="component-price-history",
+    ),
 ]
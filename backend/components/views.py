@@ -1,16 +1,28 @@
 from rest_framework import generics, status
-from .models import ComponentCategory, Component, RetailerComponentOffer
+from .models import (
+    ComponentCategory,
+    Component,
+    RetailerComponentOffer,
+)
+from .facets import get_category_facets
+from .offers import daily_price_range
+from .specs import RANGE_FILTERS
 from .serializers import (
     ComponentCategorySerializer,
     ComponentSerializer,
+    ComponentListSerializer,
     RetailerComponentOfferSerializer,
 )
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Q, Min, Max
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Min, Max, OuterRef, Subquery
+from django.utils import timezone
+from datetime import timedelta
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 import json
+import math
 
 
 class ComponentCategoryList(generics.ListAPIView):
@@ -19,13 +31,15 @@ class ComponentCategoryList(generics.ListAPIView):
 
 
 class ComponentListByCategory(generics.ListAPIView):
-    serializer_class = ComponentSerializer
+    serializer_class = ComponentListSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     search_fields = ["name", "brand", "model"]
 
     def get_queryset(self):
         category_name = self.kwargs["category_name"]
-        return Component.objects.filter(category__name__iexact=category_name)
+        return Component.objects.filter(
+            category__name__iexact=category_name
+        ).select_related("category")
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -48,211 +62,73 @@ class ComponentListByCategory(generics.ListAPIView):
         if manufacturers:
             queryset = queryset.filter(brand__in=manufacturers)
 
-        # Get components with their lowest prices
-        components_data = []
-        for component in queryset:
-            component_data = ComponentSerializer(component).data
-
-            # Get lowest price offer for this component
-            lowest_offer = (
-                RetailerComponentOffer.objects.filter(
-                    component=component, price__isnull=False, availability=True
-                )
-                .order_by("price")
-                .first()
-            )
-
-            if lowest_offer:
-                component_data["lowest_price"] = lowest_offer.price
-                component_data["lowest_price_retailer"] = lowest_offer.retailer_name
-                component_data["lowest_price_url"] = lowest_offer.url
-            else:
-                component_data["lowest_price"] = None
-                component_data["lowest_price_retailer"] = None
-                component_data["lowest_price_url"] = None
-
-            # Apply price filter if lowest price exists
-            if min_price and component_data["lowest_price"]:
-                if float(component_data["lowest_price"]) < float(min_price):
+        # Apply spec range filters, e.g. core_count_min=8&refresh_rate_min=144
+        for param, column in RANGE_FILTERS.items():
+            for bound, lookup in (("min", "gte"), ("max", "lte")):
+                value = request.GET.get(f"{param}_{bound}")
+                if not value:
                     continue
-
-            if max_price and component_data["lowest_price"]:
-                if float(component_data["lowest_price"]) > float(max_price):
+                try:
+                    number = float(value)
+                except (ValueError, TypeError):
                     continue
+                # "inf" or "1e400" parse, but overflow integer columns
+                if math.isfinite(number):
+                    queryset = queryset.filter(**{f"{column}__{lookup}": number})
+
+        # Annotate each component with its lowest available offer
+        queryset = self.annotate_lowest_offer(queryset)
+
+        # Apply price filter; components without any priced offer are kept
+        if min_price:
+            try:
+                queryset = queryset.filter(
+                    Q(lowest_price__isnull=True) | Q(lowest_price__gte=min_price)
+                )
+            except (ValueError, TypeError, ValidationError):
+                pass
 
-            components_data.append(component_data)
+        if max_price:
+            try:
+                queryset = queryset.filter(
+                    Q(lowest_price__isnull=True) | Q(lowest_price__lte=max_price)
+                )
+            except (ValueError, TypeError, ValidationError):
+                pass
 
-        # Get filter options for the category
-        category_components = Component.objects.filter(
-            category__name__iexact=self.kwargs["category_name"]
-        )
+        page = self.paginate_queryset(queryset.order_by("id"))
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
 
-        # Get unique manufacturers
-        manufacturers = list(
-            category_components.exclude(brand__isnull=True)
-            .exclude(brand="")
-            .values_list("brand", flat=True)
-            .distinct()
-        )
+        # Filter options come from the precomputed facet index of the category
+        facets = get_category_facets(self.kwargs["category_name"])
 
         # Get price range
         offers = RetailerComponentOffer.objects.filter(
-            component__in=category_components, price__isnull=False
+            component__category__name__iexact=self.kwargs["category_name"],
+            price__isnull=False,
         )
         price_range = offers.aggregate(min_price=Min("price"), max_price=Max("price"))
 
-        # Extract specs for filtering (this will vary by category)
-        specs_filters = self.extract_specs_filters(
-            category_components, self.kwargs["category_name"]
+        response.data["filters"] = {
+            "manufacturers": facets["manufacturers"],
+            "price_range": price_range,
+            "specs": facets["specs"],
+        }
+        return response
+
+    @staticmethod
+    def annotate_lowest_offer(queryset):
+        """Annotate components with the price, retailer and URL of their cheapest available offer"""
+        lowest_offer = RetailerComponentOffer.objects.filter(
+            component=OuterRef("pk"), price__isnull=False, availability=True
+        ).order_by("price", "pk")  # ties resolve to the same offer in all three
+        return queryset.annotate(
+            lowest_price=Subquery(lowest_offer.values("price")[:1]),
+            lowest_price_retailer=Subquery(lowest_offer.values("retailer_name")[:1]),
+            lowest_price_url=Subquery(lowest_offer.values("url")[:1]),
         )
 
-        return Response(
-            {
-                "results": components_data,
-                "filters": {
-                    "manufacturers": manufacturers,
-                    "price_range": price_range,
-                    "specs": specs_filters,
-                },
-            }
-        )
-
-    def extract_specs_filters(self, components, category_name):
-        """Extract filterable specifications based on category"""
-        specs_filters = {}
-
-        if category_name.upper() == "CPU":
-            # Extract CPU-specific filters
-            core_counts = set()
-            base_frequencies = set()
-            max_frequencies = set()
-            cache_sizes = set()
-            graphics_options = set()
-
-            for component in components:
-                specs = component.specs
-                if "core_count" in specs and specs["core_count"]:
-                    try:
-                        core_counts.add(int(specs["core_count"]))
-                    except (ValueError, TypeError):
-                        pass
-
-                if "base_clock" in specs and specs["base_clock"]:
-                    try:
-                        # Extract numeric value from strings like "3.6 GHz"
-                        base_freq = float(
-                            str(specs["base_clock"])
-                            .replace("GHz", "")
-                            .replace("MHz", "")
-                            .strip()
-                        )
-                        if "MHz" in str(specs["base_clock"]):
-                            base_freq = base_freq / 1000  # Convert MHz to GHz
-                        base_frequencies.add(base_freq)
-                    except (ValueError, TypeError):
-                        pass
-
-                if "boost_clock" in specs and specs["boost_clock"]:
-                    try:
-                        boost_freq = float(
-                            str(specs["boost_clock"])
-                            .replace("GHz", "")
-                            .replace("MHz", "")
-                            .strip()
-                        )
-                        if "MHz" in str(specs["boost_clock"]):
-                            boost_freq = boost_freq / 1000
-                        max_frequencies.add(boost_freq)
-                    except (ValueError, TypeError):
-                        pass
-
-                if "l3_cache" in specs and specs["l3_cache"]:
-                    try:
-                        cache = float(str(specs["l3_cache"]).replace("MB", "").strip())
-                        cache_sizes.add(cache)
-                    except (ValueError, TypeError):
-                        pass
-
-                if "graphics" in specs and specs["graphics"]:
-                    graphics_options.add(str(specs["graphics"]))
-
-            specs_filters = {
-                "core_counts": sorted(list(core_counts)),
-                "base_frequencies": sorted(list(base_frequencies)),
-                "max_frequencies": sorted(list(max_frequencies)),
-                "cache_sizes": sorted(list(cache_sizes)),
-                "graphics_options": sorted(list(graphics_options)),
-            }
-
-        elif category_name.upper() == "MEMORY":
-            # Extract Memory-specific filters
-            capacities = set()
-            types = set()
-            frequencies = set()
-
-            for component in components:
-                specs = component.specs
-                if "capacity" in specs and specs["capacity"]:
-                    try:
-                        capacity = int(str(specs["capacity"]).replace("GB", "").strip())
-                        capacities.add(capacity)
-                    except (ValueError, TypeError):
-                        pass
-
-                if "type" in specs and specs["type"]:
-                    types.add(str(specs["type"]))
-
-                if "speed" in specs and specs["speed"]:
-                    try:
-                        speed = int(str(specs["speed"]).replace("MHz", "").strip())
-                        frequencies.add(speed)
-                    except (ValueError, TypeError):
-                        pass
-
-            specs_filters = {
-                "capacities": sorted(list(capacities)),
-                "types": sorted(list(types)),
-                "frequencies": sorted(list(frequencies)),
-            }
-
-        elif category_name.upper() == "MONITOR":
-            # Extract Monitor-specific filters
-            screen_sizes = set()
-            resolutions = set()
-            refresh_rates = set()
-            panel_types = set()
-
-            for component in components:
-                specs = component.specs
-                if "screen_size" in specs and specs["screen_size"]:
-                    try:
-                        size = float(str(specs["screen_size"]).replace('"', "").strip())
-                        screen_sizes.add(size)
-                    except (ValueError, TypeError):
-                        pass
-
-                if "resolution" in specs and specs["resolution"]:
-                    resolutions.add(str(specs["resolution"]))
-
-                if "refresh_rate" in specs and specs["refresh_rate"]:
-                    try:
-                        rate = int(str(specs["refresh_rate"]).replace("Hz", "").strip())
-                        refresh_rates.add(rate)
-                    except (ValueError, TypeError):
-                        pass
-
-                if "panel_type" in specs and specs["panel_type"]:
-                    panel_types.add(str(specs["panel_type"]))
-
-            specs_filters = {
-                "screen_sizes": sorted(list(screen_sizes)),
-                "resolutions": sorted(list(resolutions)),
-                "refresh_rates": sorted(list(refresh_rates)),
-                "panel_types": sorted(list(panel_types)),
-            }
-
-        return specs_filters
-
 
 class ComponentDetail(generics.RetrieveAPIView):
     queryset = Component.objects.all()
@@ -273,3 +149,50 @@ class ComponentWithOffersView(APIView):
                 "offers": RetailerComponentOfferSerializer(offers, many=True).data,
             }
         )
+
+
+class ComponentPriceHistoryView(APIView):
+    MAX_DAYS = 365
+
+    def get(self, request, pk):
+        if not Component.objects.filter(pk=pk).exists():
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            days = min(max(1, int(request.GET.get("days", 90))), self.MAX_DAYS)
+        except (ValueError, TypeError):
+            days = 90
+        now = timezone.now()
+        since = now - timedelta(days=days)
+        month_ago = now - timedelta(days=30)
+
+        # One row per day, downsampled in the database, covering both the
+        # requested window and the last 30 days
+        rows = daily_price_range(
+            pk, min(since, month_ago), retailer=request.GET.get("retailer")
+        )
+        first_day = timezone.localdate(since)
+        series = [
+            {"day": day, "min_price": min_price, "max_price": max_price}
+            for day, min_price, max_price, _ in rows
+            if day >= first_day
+        ]
+        # Only prices the offer could be bought at
+        month_start = timezone.localdate(month_ago)
+        lowest = min(
+            (
+                min_available
+                for day, _, _, min_available in rows
+                if day >= month_start and min_available is not None
+            ),
+            default=None,
+        )
+
+        return Response(
+            {
+                "component": pk,
+                "days": days,
+                "lowest_price_30_days": lowest,
+                "series": series,
+            }
+        )
@@ -0,0 +1,47 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework import filters
+
+from .models import Product
+
+
+def search_terms(request, search_param):
+    # Passed whole to websearch_to_tsquery, which parses quotes and operators
+    return request.query_params.get(search_param, '').replace('\x00', '').strip()
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """Full-text search over Product.search_vector, annotating each match's rank
+
+    The query uses web search syntax: quoted phrases, "or" and -excluded words.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search_terms(request, self.search_param)
+        if not terms:
+            return queryset
+        query = SearchQuery(terms, search_type='websearch', config=Product.SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+
+
+class RelevanceOrderingFilter(filters.OrderingFilter):
+    """Orders searches by relevance unless the request asks for another ordering
+
+    Every ordering ends in newest first, then id, so rows that tie on the
+    requested field (most sellers share a rating) keep one order and cursor
+    pages neither skip nor repeat them.
+    """
+
+    tie_breakers = ['-created_at', '-id']
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or [])
+        fields = {field.lstrip('-') for field in ordering}
+        return ordering + [field for field in self.tie_breakers if field.lstrip('-') not in fields]
+
+    def get_default_ordering(self, view):
+        if search_terms(view.request, ProductSearchFilter.search_param):
+            return ['-search_rank', '-created_at']
+        return super().get_default_ordering(view)
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+from marketplace.models import Product
+from marketplace.views import MyProductsView, ProductListView
+
+User = get_user_model()
+
+# Common product list requests: (label, query parameters)
+LIST_QUERIES = [
+    ('latest listings', {}),
+    ('category', {'category': 'CPU'}),
+    ('category + price range', {'category': 'CPU', 'min_price': '100', 'max_price': '500'}),
+    ('category by price', {'category': 'CPU', 'ordering': 'price'}),
+    ('brand', {'brand': 'amd'}),
+    ('condition', {'condition': 'Used-Good'}),
+    ('listed this week', {'listing_age': 'week'}),
+    ('seller rated 4+', {'seller_rating': '4plus'}),
+    ('search', {'search': 'ryzen'}),
+]
+
+
+def is_full_scan(plan_line):
+    """Whether a plan line reads the whole product table rather than an index"""
+    if 'Seq Scan on marketplace_product' in plan_line:  # PostgreSQL
+        return True
+    # SQLite: "SCAN marketplace_product USING INDEX ..." walks an index instead
+    return 'SCAN marketplace_product' in plan_line and 'USING' not in plan_line
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the common product list queries and report their plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Execute the queries and report actual timings (PostgreSQL only)'
+        )
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options = {'analyze': True, 'buffers': True}
+
+        factory = APIRequestFactory()
+        queries = [
+            (label, ProductListView, factory.get('/api/marketplace/products/', params))
+            for label, params in LIST_QUERIES
+        ]
+        seller = Product.objects.values_list('seller', flat=True).first()
+        if seller:
+            request = factory.get('/api/marketplace/products/my/')
+            force_authenticate(request, user=User.objects.get(pk=seller))
+            queries.append(('my products', MyProductsView, request))
+
+        full_scans = []
+        for label, view_class, request in queries:
+            queryset = self.page_queryset(view_class, request)
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {label}'))
+            self.stdout.write(plan)
+            if any(is_full_scan(line) for line in plan.splitlines()):
+                full_scans.append(label)
+
+        if full_scans:
+            self.stdout.write(self.style.WARNING(
+                f'Full scans of marketplace_product: {", ".join(full_scans)}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full scans of marketplace_product'))
+
+    @staticmethod
+    def page_queryset(view_class, django_request):
+        """The queryset a view evaluates for the first page of a request"""
+        view = view_class()
+        view.format_kwarg = None
+        view.request = view.initialize_request(django_request)
+        view.request.user  # authenticate, as dispatch() would
+        queryset = view.filter_queryset(view.get_queryset())
+        page_size = view.paginator.get_page_size(view.request)
+        return queryset[:page_size + 1]
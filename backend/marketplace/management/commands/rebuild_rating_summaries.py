@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from marketplace.models import SellerRating, SellerRatingSummary
+
+
+class Command(BaseCommand):
+    help = 'Recompute seller rating summaries, e.g. after ratings were changed in bulk'
+
+    def handle(self, *args, **options):
+        seller_ids = SellerRating.objects.values_list('seller_id', flat=True).distinct()
+        rebuilt = 0
+        for seller_id in seller_ids:
+            SellerRatingSummary.refresh(seller_id)
+            rebuilt += 1
+        # Sellers whose last rating is gone keep no summary
+        stale = SellerRatingSummary.objects.exclude(seller_id__in=seller_ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rebuilt} seller rating summaries, removed {stale} stale ones'
+        ))
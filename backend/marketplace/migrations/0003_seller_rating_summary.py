@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q
+
+
+def backfill_seller_rating_summaries(apps, schema_editor):
+    SellerRating = apps.get_model('marketplace', 'SellerRating')
+    SellerRatingSummary = apps.get_model('marketplace', 'SellerRatingSummary')
+    totals = SellerRating.objects.values('seller_id').annotate(
+        average=Avg('rating'),
+        count=Count('id'),
+        **{f'stars_{stars}': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)},
+    )
+    SellerRatingSummary.objects.bulk_create(
+        [SellerRatingSummary(**row) for row in totals], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0002_delete_productrating'),
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerRatingSummary',
+            fields=[
+                ('seller', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('average', models.FloatField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_seller_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0004_product_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sellerratingsummary',
+            index=models.Index(fields=['average'], name='seller_rating_average_idx'),
+        ),
+    ]
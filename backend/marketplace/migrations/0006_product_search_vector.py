@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_seller_rating_average_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        'name', config='english', weight='A'
+                    ),
+                    '||',
+                    django.contrib.postgres.search.SearchVector(
+                        'description', 'brand', 'category', config='english', weight='B'
+                    ),
+                    django.contrib.postgres.search.SearchConfig('english'),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='product_search_idx'
+            ),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Avg, Count, Q
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -79,7 +82,8 @@ class Product(models.Model):
         ('high', 'High-end'),
     ]
     
-    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='products')
+    # Indexed by product_seller_recent_idx, which leads with seller
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='products', db_index=False)
     name = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
@@ -99,13 +103,34 @@ class Product(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Text search configuration shared by the search vector and search queries
+    SEARCH_CONFIG = 'english'
+    # Computed by the database on every write, so no update path leaves it stale
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('name', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', 'brand', 'category', weight='B', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     
     class Meta:
         ordering = ['-created_at']
+        # Built from ProductListView's filter combinations; listings only ever
+        # show available products, so most indexes leave the rest out
+        indexes = [
+            models.Index(fields=['-created_at'], condition=Q(is_available=True), name='product_available_recent_idx'),
+            models.Index(fields=['category', '-created_at'], condition=Q(is_available=True), name='product_category_recent_idx'),
+            models.Index(fields=['category', 'price'], condition=Q(is_available=True), name='product_category_price_idx'),
+            models.Index(fields=['seller', '-created_at'], name='product_seller_recent_idx'),
+            GinIndex(fields=['search_vector'], name='product_search_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.seller.username}"
-    
+
     @property
     def average_rating(self):
         ratings = self.ratings.all()
@@ -203,3 +228,43 @@ class SellerRating(models.Model):
     
     def __str__(self):
         return f"{self.rater.username} rated seller {self.seller.username} - {self.rating} stars"
+
+class SellerRatingSummary(models.Model):
+    """Denormalized aggregate of a seller's ratings, refreshed on every rating write"""
+    seller = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    average = models.FloatField(default=0)
+    count = models.PositiveIntegerField(default=0)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Backs the seller_rating filters and ordering of the product list
+            models.Index(fields=['average'], name='seller_rating_average_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.seller.username}: {self.average} ({self.count} ratings)"
+
+    @property
+    def distribution(self):
+        return {stars: getattr(self, f'stars_{stars}') for stars in range(1, 6)}
+
+    @classmethod
+    def refresh(cls, seller_id):
+        """Recompute a seller's summary from its ratings with a single aggregate query"""
+        totals = SellerRating.objects.filter(seller_id=seller_id).aggregate(
+            average=Avg('rating'),
+            count=Count('id'),
+            **{f'stars_{stars}': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)},
+        )
+        if not totals['count']:
+            # Sellers without ratings have no summary, like before they were rated
+            cls.objects.filter(seller_id=seller_id).delete()
+            return None
+        summary, _ = cls.objects.update_or_create(seller_id=seller_id, defaults=totals)
+        return summary
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import Prefetch
 from .models import Product, Order, Chat, Message, SellerRating
 from django.contrib.auth import get_user_model
 
@@ -30,19 +31,35 @@ class ProductSerializer(serializers.ModelSerializer):
                  'seller_rating', 'seller_rating_count', 'seller_rating_distribution', 'user_seller_rating']
         read_only_fields = ['seller', 'created_at', 'updated_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset, user):
+        """Load everything the serializer reads: the seller and its rating summary
+        joined, and the user's own ratings of the sellers in one batched query.
+        The search vector is only used inside queries and is never loaded."""
+        queryset = queryset.select_related('seller', 'seller__rating_summary').defer('search_vector')
+        if user.is_authenticated:
+            queryset = queryset.prefetch_related(Prefetch(
+                'seller__seller_ratings',
+                queryset=SellerRating.objects.filter(rater=user),
+                to_attr='current_user_ratings',
+            ))
+        return queryset
+
     def get_user_seller_rating(self, obj):
         """Get the current user's rating for this seller"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            try:
-                rating = obj.seller.seller_ratings.get(rater=request.user)
-                return {
-                    'rating': rating.rating,
-                    'review': rating.review,
-                    'created_at': rating.created_at
-                }
-            except SellerRating.DoesNotExist:
+            if hasattr(obj.seller, 'current_user_ratings'):
+                rating = next(iter(obj.seller.current_user_ratings), None)
+            else:
+                rating = obj.seller.seller_ratings.filter(rater=request.user).first()
+            if rating is None:
                 return None
+            return {
+                'rating': rating.rating,
+                'review': rating.review,
+                'created_at': rating.created_at
+            }
         return None
 
 class ProductCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,19 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SellerRating, SellerRatingSummary, User
+
+
+def refresh_if_seller_exists(seller_id):
+    # Ratings are also deleted when their seller is, along with the summary
+    if User.objects.filter(pk=seller_id).exists():
+        SellerRatingSummary.refresh(seller_id)
+
+
+@receiver(post_save, sender=SellerRating)
+@receiver(post_delete, sender=SellerRating)
+def refresh_seller_rating_summary(sender, instance, **kwargs):
+    transaction.on_commit(partial(refresh_if_seller_exists, instance.seller_id))
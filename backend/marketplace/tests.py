@@ -1,3 +1,197 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Product, SellerRating
+
+User = get_user_model()
+
+
+class ProductQueryCountTests(TestCase):
+    """Listing products costs a fixed number of queries, whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create(username='buyer', email='buyer@example.com')
+        raters = [
+            User.objects.create(username=f'rater{i}', email=f'rater{i}@example.com')
+            for i in range(3)
+        ]
+        cls.sellers = [
+            User.objects.create(username=f'seller{i}', email=f'seller{i}@example.com')
+            for i in range(4)
+        ]
+        # Rating summaries are refreshed on commit
+        with cls.captureOnCommitCallbacks(execute=True):
+            for i, seller in enumerate(cls.sellers):
+                for j in range(10):
+                    Product.objects.create(
+                        seller=seller, name=f'Product {i}-{j}', price=100 + j,
+                        category='CPU', condition='Used-Good', description='Test product',
+                    )
+                for rater in raters:
+                    SellerRating.objects.create(seller=seller, rater=rater, rating=4)
+                if i % 2 == 0:
+                    SellerRating.objects.create(seller=seller, rater=cls.buyer, rating=2)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get_list(self, page_size, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(reverse('product-list'), {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), page_size)
+        return response.data['results']
+
+    def test_anonymous_list_is_one_query(self):
+        for page_size in (5, 40):
+            self.get_list(page_size, queries=1)
+
+    def test_authenticated_list_batches_user_ratings(self):
+        self.client.force_authenticate(self.buyer)
+        for page_size in (5, 40):
+            results = self.get_list(page_size, queries=2)
+
+        by_seller = {product['seller']: product for product in results}
+        rated = by_seller[self.sellers[0].id]
+        self.assertEqual(rated['user_seller_rating']['rating'], 2)
+        self.assertEqual(rated['seller_rating'], 3.5)
+        self.assertEqual(rated['seller_rating_count'], 4)
+        self.assertEqual(rated['seller_rating_distribution'], {1: 0, 2: 1, 3: 0, 4: 3, 5: 0})
+        self.assertIsNone(by_seller[self.sellers[1].id]['user_seller_rating'])
+
+    def test_detail_view(self):
+        self.client.force_authenticate(self.buyer)
+        product = Product.objects.filter(seller=self.sellers[0]).first()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('product-detail', args=[product.pk]))
+        self.assertEqual(response.data['user_seller_rating']['rating'], 2)
+
+    def test_my_products(self):
+        self.client.force_authenticate(self.sellers[1])
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('my-products'), {'page_size': 10})
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['seller_rating'], 4.0)
+
+
+class ProductSellerRatingFilterTests(TestCase):
+    """seller_rating filters and ordering read the per-seller rating summary"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rater = User.objects.create(username='rater', email='rater@example.com')
+        cls.products = {}
+        with cls.captureOnCommitCallbacks(execute=True):
+            for name, rating in [('top', 5), ('good', 3), ('poor', 1), ('new', None)]:
+                seller = User.objects.create(username=name, email=f'{name}@example.com')
+                cls.products[name] = Product.objects.create(
+                    seller=seller, name=f'{name} product', price=100,
+                    category='CPU', condition='Used-Good', description='Test product',
+                )
+                if rating:
+                    SellerRating.objects.create(seller=seller, rater=rater, rating=rating)
+
+    def get_names(self, params):
+        response = APIClient().get(reverse('product-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [product['name'] for product in response.data['results']]
+
+    def test_filters(self):
+        self.assertCountEqual(self.get_names({'seller_rating': '4plus'}), ['top product'])
+        self.assertCountEqual(
+            self.get_names({'seller_rating': '3plus'}), ['top product', 'good product']
+        )
+        self.assertCountEqual(self.get_names({'seller_rating': 'new'}), ['new product'])
+
+    def test_ordering(self):
+        self.assertEqual(
+            self.get_names({'ordering': '-seller_rating_average'})[:3],
+            ['top product', 'good product', 'poor product'],
+        )
+
+    def test_cursor_pages_through_ties(self):
+        # Same rating and same created_at: only the id tells these apart
+        seller = self.products['new'].seller
+        created_at = self.products['new'].created_at
+        for i in range(6):
+            Product.objects.create(
+                seller=seller, name=f'tied product {i}', price=100,
+                category='CPU', condition='Used-Good', description='Test product',
+            )
+        Product.objects.filter(seller=seller).update(created_at=created_at)
+
+        client = APIClient()
+        names = []
+        response = client.get(
+            reverse('product-list'), {'ordering': '-seller_rating_average', 'page_size': 2}
+        )
+        while True:
+            self.assertEqual(response.status_code, 200)
+            names += [product['name'] for product in response.data['results']]
+            if not response.data['next']:
+                break
+            response = client.get(response.data['next'])
+        self.assertEqual(
+            names,
+            ['top product', 'good product', 'poor product']
+            + [f'tied product {i}' for i in reversed(range(6))] + ['new product'],
+        )
+
+
+class ProductSearchTests(TestCase):
+    """Searches match the product search vector and rank name matches first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seller = User.objects.create(username='seller', email='seller@example.com')
+        products = [
+            ('Gaming bundle', 'Ships with a Ryzen 5 processor', 'CPU'),
+            ('AMD Ryzen 5 5600X', 'Boxed, barely used', 'CPU'),
+            ('Ryzen 7 5800X', 'Used for a year', 'CPU'),
+            ('Corsair Vengeance 16GB', 'DDR4 kit', 'RAM'),
+        ]
+        cls.products = [
+            Product.objects.create(
+                seller=seller, name=name, description=description, price=100,
+                category=category, condition='Used-Good',
+            )
+            for name, description, category in products
+        ]
+
+    def search(self, terms, **params):
+        response = APIClient().get(reverse('product-list'), {'search': terms, **params})
+        self.assertEqual(response.status_code, 200)
+        return [product['name'] for product in response.data['results']]
+
+    def test_name_matches_rank_first(self):
+        names = self.search('ryzen 5')
+        self.assertEqual(names, ['AMD Ryzen 5 5600X', 'Gaming bundle'])
+
+    def test_web_search_syntax(self):
+        self.assertEqual(self.search('ryzen -used'), ['Gaming bundle'])
+        self.assertCountEqual(
+            self.search('corsair or 5800X'), ['Corsair Vengeance 16GB', 'Ryzen 7 5800X']
+        )
+
+    def test_explicit_ordering_overrides_rank(self):
+        names = self.search('ryzen', ordering='created_at')
+        self.assertEqual(names, ['Gaming bundle', 'AMD Ryzen 5 5600X', 'Ryzen 7 5800X'])
+
+    def test_vector_follows_edits(self):
+        product = self.products[3]
+        product.name = 'Kingston Fury 16GB'
+        product.save(update_fields=['name'])
+        self.assertEqual(self.search('kingston'), ['Kingston Fury 16GB'])
+        self.assertEqual(self.search('corsair'), [])
+
+        # Bulk writes bypass save(); the generated column follows them too
+        Product.objects.filter(pk=product.pk).update(description='Low profile heat spreader')
+        self.assertEqual(self.search('heat spreader'), ['Kingston Fury 16GB'])
+        Product.objects.bulk_create([
+            Product(seller=product.seller, name='Crucial P3 1TB', description='NVMe SSD',
+                    price=80, category='Storage', condition='Used-Like New')
+        ])
+        self.assertEqual(self.search('nvme'), ['Crucial P3 1TB'])
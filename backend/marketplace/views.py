@@ -4,28 +4,34 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from django.db.models import Q, Avg
+from django.db.models import Q
+from django.db.models.functions import Coalesce
 from datetime import datetime, timedelta
 from .models import Product, Order, Chat, Message, SellerRating
 from .serializers import (
     ProductSerializer, ProductCreateSerializer, OrderSerializer,
     ChatSerializer, MessageSerializer, SellerRatingSerializer
 )
+from .filters import ProductSearchFilter, RelevanceOrderingFilter
 from .pagination import CursorPagination
 
 class ProductListView(generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
     pagination_class = CursorPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, RelevanceOrderingFilter]
     filterset_fields = ['category', 'condition', 'age', 'warranty', 'box_accessories', 
                        'price_type', 'availability', 'brand', 'compatibility', 'performance_tier']
-    search_fields = ['name', 'description']
-    ordering_fields = ['price', 'created_at']
+    ordering_fields = ['price', 'created_at', 'seller_rating_average']
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = Product.objects.filter(is_available=True)
+        queryset = ProductSerializer.setup_eager_loading(
+            Product.objects.filter(is_available=True), self.request.user
+        ).annotate(
+            # Unrated sellers sort as 0; a real attribute so cursors can page on it
+            seller_rating_average=Coalesce('seller__rating_summary__average', 0.0)
+        )
         
         min_price = self.request.query_params.get('min_price')
         max_price = self.request.query_params.get('max_price')
@@ -49,16 +55,13 @@ class ProductListView(generics.ListAPIView):
         listing_age = self.request.query_params.get('listing_age')
         
         if seller_rating:
+            # Reads the maintained per-seller summary, an indexed predicate
             if seller_rating == '4plus':
-                queryset = queryset.filter(seller__seller_ratings__rating__gte=4).annotate(
-                    avg_seller_rating=Avg('seller__seller_ratings__rating')
-                ).filter(avg_seller_rating__gte=4.0).distinct()
+                queryset = queryset.filter(seller__rating_summary__average__gte=4.0)
             elif seller_rating == '3plus':
-                queryset = queryset.filter(seller__seller_ratings__rating__gte=3).annotate(
-                    avg_seller_rating=Avg('seller__seller_ratings__rating')
-                ).filter(avg_seller_rating__gte=3.0).distinct()
+                queryset = queryset.filter(seller__rating_summary__average__gte=3.0)
             elif seller_rating == 'new':
-                queryset = queryset.filter(seller__seller_ratings__isnull=True)
+                queryset = queryset.filter(seller__rating_summary__isnull=True)
             
         if listing_age:
             if listing_age == 'today':
@@ -82,7 +85,11 @@ class ProductCreateView(generics.CreateAPIView):
 class ProductDetailView(generics.RetrieveAPIView):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
-    queryset = Product.objects.filter(is_available=True)
+    
+    def get_queryset(self):
+        return ProductSerializer.setup_eager_loading(
+            Product.objects.filter(is_available=True), self.request.user
+        )
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -94,7 +101,9 @@ class MyProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Product.objects.filter(seller=self.request.user)
+        return ProductSerializer.setup_eager_loading(
+            Product.objects.filter(seller=self.request.user), self.request.user
+        )
 
 class MyProductsView(generics.ListAPIView):
     serializer_class = ProductSerializer
@@ -106,7 +115,9 @@ class MyProductsView(generics.ListAPIView):
     ordering = ['-created_at']
     
     def get_queryset(self):
-        return Product.objects.filter(seller=self.request.user)
+        return ProductSerializer.setup_eager_loading(
+            Product.objects.filter(seller=self.request.user), self.request.user
+        )
 
 class OrderCreateView(generics.CreateAPIView):
     serializer_class = OrderSerializer
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.utils import timezone
 import random
@@ -46,23 +47,27 @@ class User(AbstractUser):
             return True
         return False
 
+    @property
+    def seller_rating_summary(self):
+        """Maintained by marketplace signals; None until the seller is first rated"""
+        try:
+            return self.rating_summary
+        except ObjectDoesNotExist:
+            return None
+
     @property
     def seller_rating(self):
-       
-        ratings = self.seller_ratings.all()
-        if ratings.exists():
-            total = sum(rating.rating for rating in ratings)
-            return round(total / ratings.count(), 1)
-        return 0
+        summary = self.seller_rating_summary
+        return round(summary.average, 1) if summary and summary.count else 0
 
     @property
     def seller_rating_count(self):
-        return self.seller_ratings.count()
+        summary = self.seller_rating_summary
+        return summary.count if summary else 0
 
     @property
     def seller_rating_distribution(self):
-        ratings = self.seller_ratings.all()
-        distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for rating in ratings:
-            distribution[rating.rating] += 1
-        return distribution
+        summary = self.seller_rating_summary
+        if summary:
+            return summary.distribution
+        return {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
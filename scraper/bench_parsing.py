@@ -0,0 +1,215 @@
+"""Per-page parse time of the listing parsers, before and after the lxml path.
+
+Pages come from the response cache (data/http_cache) when it holds listing
+pages; otherwise listing pages are rebuilt in each site's markup from the
+saved products in data/*_products.json, 20 products per page as served.
+
+    python bench_parsing.py [--rounds 5] [--cache-dir data/http_cache]
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+import ryans_scraper
+import startech_scraper
+from html_parsing import PARSER
+from http_cache import DEFAULT_CACHE_DIR
+
+PAGE_SIZE = 20
+
+# Navigation, filters and footer links around the product grid of a real page
+CHROME = "".join(
+    f'<li class="nav-item"><a href="/category-{n}">Category {n}</a>'
+    f'<ul><li><a href="/category-{n}/sub">Sub {n}</a></li></ul></li>'
+    for n in range(300)
+)
+
+STARTECH_CARD = """
+<div class="p-item"><div class="p-item-inner">
+  <div class="p-item-img"><a href="{url}"><img src="{image_url}" alt="{name}"></a></div>
+  <div class="p-item-details">
+    <h4 class="p-item-name"><a href="{url}">{name}</a></h4>
+    <div class="short-description"><ul><li>Model: {model}</li></ul></div>
+    <div class="p-item-price"><span class="price-new">{price}৳</span></div>
+    <div class="actions"><button class="btn">{button}</button></div>
+  </div>
+</div></div>"""
+
+RYANS_CARD = """
+<div class="category-single-product"><div class="card h-100">
+  <div class="image-box"><a href="{url}"><img src="{image_url}" alt="{name}"></a></div>
+  <div class="card-body text-center">
+    <p class="card-text p-0 m-0 grid-view-text"><a href="{url}">{name}</a></p>
+    <a class="pr-text cat-sp-text" href="{url}">Tk {price}</a>
+    <button class="btn">{button}</button>
+  </div>
+</div></div>"""
+
+
+def build_page(card, products):
+    cards = []
+    for product in products:
+        in_stock = product.get("availability") == "In Stock"
+        cards.append(
+            card.format(
+                url=html.escape(product["url"]),
+                image_url=html.escape(product.get("image_url") or ""),
+                name=html.escape(product["retailer_name"]),
+                model=html.escape(product.get("model") or ""),
+                price=f"{product.get('price') or 0:,}",
+                button="Add to Cart" if in_stock else "Out Of Stock",
+            )
+        )
+    return (
+        f"<html><head><title>Listing</title></head><body>"
+        f'<nav><ul class="navbar">{CHROME}</ul></nav>'
+        f'<div class="main-content">{"".join(cards)}</div>'
+        f"<footer><ul>{CHROME}</ul></footer></body></html>"
+    ).encode("utf-8")
+
+
+def saved_pages():
+    pages = {}
+    for site, card in (("startech", STARTECH_CARD), ("ryans", RYANS_CARD)):
+        with open(f"data/{site}_products.json", encoding="utf-8") as f:
+            products = json.load(f)
+        pages[site] = [
+            build_page(card, products[start : start + PAGE_SIZE])
+            for start in range(0, len(products), PAGE_SIZE)
+        ]
+    return pages
+
+
+def cached_pages(cache_dir):
+    pages = {"startech": [], "ryans": []}
+    if not os.path.isdir(cache_dir):
+        return pages
+    for filename in os.listdir(cache_dir):
+        if not filename.endswith(".html"):
+            continue
+        with open(os.path.join(cache_dir, filename), "rb") as f:
+            body = f.read()
+        if b'class="p-item"' in body:
+            pages["startech"].append(body)
+        elif b"category-single-product" in body:
+            pages["ryans"].append(body)
+    return pages
+
+
+# -- Parsers as they were: full html.parser tree, lambda class matchers --
+
+
+def startech_before(content):
+    soup = BeautifulSoup(content, "html.parser")
+    return [
+        startech_scraper.parse_product(cont, "CPU")
+        for cont in soup.find_all("div", class_="p-item")
+    ]
+
+
+def ryans_before(content):
+    soup = BeautifulSoup(content, "html.parser")
+    items = []
+    for cont in soup.find_all(
+        "div", class_=lambda c: c and "category-single-product" in c
+    ):
+        img = cont.find("img", alt=True)
+        if not img:
+            continue
+        imgsrc = img.get("src", "")
+        link = cont.find("a", href=True)
+        price_tag = cont.find("a", class_=lambda c: c and "pr-text" in c)
+        price = None
+        if price_tag:
+            m = re.search(r"Tk\s*([\d,]+)", price_tag.get_text(strip=True))
+            if m:
+                price = int(m.group(1).replace(",", ""))
+        in_stock = "Add to Cart" in cont.get_text()
+        items.append(
+            {
+                "retailer": "ryans",
+                "retailer_name": img["alt"].strip(),
+                "price": price,
+                "url": urljoin("https://www.ryans.com", link["href"]) if link else "",
+                "image_url": (
+                    imgsrc
+                    if imgsrc.startswith("http")
+                    else urljoin("https://www.ryans.com", imgsrc.lstrip("./"))
+                ),
+                "availability": "In Stock" if in_stock else "Out of Stock",
+                "category": "CPU",
+            }
+        )
+    return items
+
+
+# -- Current parsers: lxml with a SoupStrainer on the product containers --
+
+
+def startech_after(content):
+    return [
+        startech_scraper.parse_product(cont, "CPU")
+        for cont in startech_scraper.find_products(content)
+    ]
+
+
+def ryans_after(content):
+    items = (
+        ryans_scraper.parse_product(cont, "CPU")
+        for cont in ryans_scraper.find_products(content)
+    )
+    return [item for item in items if item]
+
+
+def per_page_ms(parse, pages, rounds):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for page in pages:
+            parse(page)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(pages) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    pages = cached_pages(args.cache_dir)
+    source = "cached"
+    if not pages["startech"] and not pages["ryans"]:
+        pages = saved_pages()
+        source = "rebuilt from saved products"
+
+    print(f"Parser backend: {PARSER}; pages {source}")
+    benchmarks = (
+        ("startech", startech_before, startech_after),
+        ("ryans", ryans_before, ryans_after),
+    )
+    for site, before, after in benchmarks:
+        if not pages[site]:
+            continue
+        found = 0
+        for number, page in enumerate(pages[site], start=1):
+            # Class matching went from substring to whole class names, so
+            # the extracted records are compared field by field
+            items = after(page)
+            assert items == before(page), f"{site} page {number} parses differently"
+            found += len(items)
+        before_ms = per_page_ms(before, pages[site], args.rounds)
+        after_ms = per_page_ms(after, pages[site], args.rounds)
+        print(
+            f"{site}: {len(pages[site])} pages, {found} products, "
+            f"{before_ms:.2f} ms/page before, {after_ms:.2f} ms/page after "
+            f"({before_ms / after_ms:.1f}x)"
+        )
@@ -0,0 +1,122 @@
+import argparse
+import logging
+import time
+
+from crawl_engine import crawl
+from crawl_schedule import DEFAULT_SCHEDULE_PATH, CrawlSchedule
+from http_cache import DEFAULT_CACHE_DIR, ResponseCache
+from scrape_run import ScrapeRun, write_ndjson
+from startech_scraper import DETAIL_TTL, StarTechAdapter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_adapters(names):
+    adapters = []
+    for name in names:
+        if name == "startech":
+            adapters.append(StarTechAdapter())
+        elif name == "ryans":
+            # Imported lazily: the module also pulls in selenium for RyansScraper
+            from ryans_scraper import RyansAdapter
+
+            adapters.append(RyansAdapter())
+    return adapters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Crawl several retailers concurrently with the async engine"
+    )
+    parser.add_argument(
+        "--sites",
+        nargs="+",
+        choices=["startech", "ryans"],
+        default=["startech"],
+        help="Retailers to crawl (default: startech)",
+    )
+    parser.add_argument("--max-pages", type=int, default=5)
+    parser.add_argument(
+        "--max-per-domain",
+        type=int,
+        default=1,
+        help="Concurrent requests per site (default=1)",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between request starts per site (default=1)",
+    )
+    parser.add_argument(
+        "--output",
+        default="data/crawled_products.ndjson",
+        help="NDJSON file products are streamed to",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted crawl from its checkpoint",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Response cache directory (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Always download every page"
+    )
+    parser.add_argument(
+        "--detail-ttl",
+        type=int,
+        default=DETAIL_TTL,
+        help="Seconds a cached detail page is used without revalidation",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Parse cached pages only, without any network request",
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        help="Scheduled crawl: send at most this many requests, listing and "
+        "detail pages alike, taking the most volatile and stale listings first",
+    )
+    parser.add_argument(
+        "--schedule",
+        default=DEFAULT_SCHEDULE_PATH,
+        help="Per-page crawl history used with --budget "
+        f"(default: {DEFAULT_SCHEDULE_PATH})",
+    )
+    args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error("--offline replays the cache and cannot be used with --no-cache")
+    if args.budget is not None and args.resume:
+        parser.error("--resume cannot be used with --budget")
+
+    options = dict(
+        max_pages=args.max_pages,
+        max_per_domain=args.max_per_domain,
+        min_interval=args.min_interval,
+        cache=None if args.no_cache else ResponseCache(args.cache_dir),
+        detail_ttl=args.detail_ttl,
+        offline=args.offline,
+    )
+    started = time.perf_counter()
+    if args.budget is not None:
+        products = crawl(
+            get_adapters(args.sites),
+            schedule=CrawlSchedule(args.schedule),
+            budget=args.budget,
+            **options,
+        )
+        write_ndjson(products, args.output)
+        written = len(products)
+    else:
+        with ScrapeRun(args.output, resume=args.resume) as run:
+            crawl(get_adapters(args.sites), scrape_run=run, **options)
+        written = run.written
+    elapsed = time.perf_counter() - started
+    logger.info(f"Wrote {written} products to {args.output} in {elapsed:.1f}s")
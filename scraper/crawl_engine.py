@@ -0,0 +1,327 @@
+import asyncio
+import itertools
+import logging
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36"
+
+# Lower numbers are crawled first: finishing detail pages before opening more
+# listing pages keeps the number of half-built items small
+DETAIL_PRIORITY = 0
+LISTING_PRIORITY = 1
+
+
+class SiteAdapter(ABC):
+    """What the crawl engine needs to know about a retailer site.
+
+    Subclasses only define URL patterns and parsers; fetching, retries,
+    politeness and scheduling are handled by AsyncCrawler.
+    """
+
+    name = ""
+    base_url = ""
+    categories = {}
+
+    @abstractmethod
+    def listing_url(self, path, page):
+        """URL of a page of a category listing"""
+
+    @abstractmethod
+    def parse_listing(self, html, category_name):
+        """Return the items found on a listing page (an empty list ends pagination)"""
+
+    def detail_url(self, item):
+        """URL to fetch to complete an item, or None when the listing is enough"""
+        return None
+
+    def parse_detail(self, html, item):
+        """Complete an item from its detail page"""
+        return item
+
+
+class DomainLimiter:
+    """Per-domain concurrency cap and minimum spacing between request starts"""
+
+    def __init__(self, max_concurrent, min_interval):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self.semaphores = {}
+        self.next_slot = {}
+
+    async def wait(self, domain):
+        semaphore = self.semaphores.setdefault(
+            domain, asyncio.Semaphore(self.max_concurrent)
+        )
+        await semaphore.acquire()
+        now = time.monotonic()
+        start = max(now, self.next_slot.get(domain, now))
+        self.next_slot[domain] = start + self.min_interval
+        await asyncio.sleep(start - now)
+
+    def release(self, domain):
+        self.semaphores[domain].release()
+
+
+class AsyncCrawler:
+    """Crawl the categories of several site adapters over one pooled HTTP client.
+
+    Listing and detail URLs share a priority queue. Pages of a category are
+    walked in order, the next one being queued once the current one parsed
+    with products, while categories and sites proceed concurrently within the
+    per-domain limits. These default to one request at a time per domain,
+    a second apart, as the serial scrapers did; raising max_per_domain or
+    lowering min_interval is up to the caller.
+    """
+
+    def __init__(
+        self,
+        adapters,
+        max_pages=2,
+        max_per_domain=1,
+        min_interval=1.0,
+        max_retries=3,
+        timeout=10,
+        cache=None,
+        detail_ttl=None,
+        offline=False,
+        scrape_run=None,
+        schedule=None,
+        budget=None,
+    ):
+        self.adapters = adapters
+        self.max_pages = max_pages
+        self.max_per_domain = max_per_domain
+        self.limiter = DomainLimiter(max_per_domain, min_interval)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.cache = cache
+        self.detail_ttl = detail_ttl
+        self.offline = offline
+        if scrape_run and schedule:
+            # Checkpoints assume pages are written in order, a schedule skips pages
+            raise ValueError("A scheduled crawl cannot be checkpointed")
+        self.scrape_run = scrape_run
+        self.schedule = schedule
+        self.budget = budget
+        # (category key, page) -> [detail pages pending, completed items]
+        self.pages = {}
+        self.items = []
+
+    async def fetch(self, client, url, ttl=None):
+        """Return the page text, from the ResponseCache when possible.
+
+        Cached pages younger than ttl seconds are not requested again, older
+        ones are revalidated with a conditional request; offline, only the
+        cache is read. A page that does not exist (404) is returned empty, so
+        a listing past its last page ends pagination; None means the fetch
+        failed.
+        """
+        entry = self.cache.get(url) if self.cache else None
+        if self.offline:
+            return entry.body.decode("utf-8", "replace") if entry else None
+        if entry and entry.is_fresh(ttl):
+            return entry.body.decode("utf-8", "replace")
+        headers = entry.conditional_headers() if entry else {}
+
+        domain = urlparse(url).netloc
+        for attempt in range(self.max_retries):
+            if not self.charge_request():
+                logger.warning(f"Request budget spent, skipping {url}")
+                return None
+            await self.limiter.wait(domain)
+            try:
+                resp = await client.get(url, headers=headers)
+                if resp.status_code == 304 and entry:
+                    self.cache.touch(entry, resp.headers)
+                    return entry.body.decode("utf-8", "replace")
+                if resp.status_code == 404:
+                    return ""
+                resp.raise_for_status()
+                if self.cache:
+                    self.cache.store(url, resp.content, resp.headers)
+                return resp.text
+            except httpx.HTTPStatusError as e:
+                logger.warning(f"Attempt {attempt+1} failed for {url}: {e}")
+                # Client errors other than rate limiting will not go away
+                if e.response.is_client_error and e.response.status_code != 429:
+                    return None
+            except httpx.HTTPError as e:
+                logger.warning(f"Attempt {attempt+1} failed for {url}: {e}")
+            finally:
+                self.limiter.release(domain)
+            if attempt + 1 < self.max_retries:
+                await asyncio.sleep(2**attempt)
+        logger.error(f"Failed to fetch {url} after {self.max_retries} retries")
+        return None
+
+    def charge_request(self):
+        """Count one outgoing request against the budget; False once it is spent
+
+        Every request is charged, listing or detail page, retry or
+        conditional revalidation; pages served from the cache are free.
+        """
+        if self.budget is None:
+            return True
+        if self.budget <= 0:
+            return False
+        self.budget -= 1
+        return True
+
+    async def on_item(self, item):
+        """Awaited with every completed item; collects them unless streaming.
+
+        Overrides must not block the event loop, or every request in flight
+        stalls with it.
+        """
+        if self.scrape_run is None:
+            self.items.append(item)
+
+    async def item_done(self, key, page, item):
+        await self.on_item(item)
+        if self.scrape_run is None:
+            return
+        state = self.pages[(key, page)]
+        state[0] -= 1
+        state[1].append(item)
+        if state[0] == 0:
+            del self.pages[(key, page)]
+            self.scrape_run.page_done(key, page, state[1])
+
+    async def run(self):
+        queue = asyncio.PriorityQueue()
+        sequence = itertools.count()
+
+        def enqueue(priority, kind, url, payload):
+            queue.put_nowait((priority, next(sequence), kind, url, payload))
+
+        if self.schedule:
+            planned = self.schedule.plan(self.adapters, self.budget, self.max_pages)
+            logger.info(f"Scheduled {len(planned)} listing pages")
+            for adapter, category_name, path, page in planned:
+                url = adapter.listing_url(path, page)
+                payload = (adapter, category_name, path, page)
+                enqueue(LISTING_PRIORITY, "listing", url, payload)
+        else:
+            for adapter in self.adapters:
+                for category_name, path in adapter.categories.items():
+                    page = 1
+                    if self.scrape_run:
+                        key = f"{adapter.name}:{category_name}"
+                        if self.scrape_run.is_done(key):
+                            continue
+                        page = self.scrape_run.next_page(key)
+                        if page > self.max_pages:
+                            continue
+                    url = adapter.listing_url(path, page)
+                    payload = (adapter, category_name, path, page)
+                    enqueue(LISTING_PRIORITY, "listing", url, payload)
+
+        async def worker(client):
+            while True:
+                priority, _, kind, url, payload = await queue.get()
+                try:
+                    if kind == "listing":
+                        html = await self.fetch(client, url)
+                        await self.handle_listing(html, payload, enqueue)
+                    else:
+                        await self.handle_detail(client, url, payload)
+                except Exception:
+                    logger.exception(f"Failed to process {url}")
+                finally:
+                    queue.task_done()
+
+        domains = {urlparse(adapter.base_url).netloc for adapter in self.adapters}
+        concurrency = max(1, self.max_per_domain * len(domains))
+        limits = httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        )
+        async with httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            limits=limits,
+            timeout=self.timeout,
+            follow_redirects=True,
+        ) as client:
+            workers = [asyncio.create_task(worker(client)) for _ in range(concurrency)]
+            await queue.join()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        if self.schedule:
+            self.schedule.save()
+        return self.items
+
+    async def handle_listing(self, html, payload, enqueue):
+        adapter, category_name, path, page = payload
+        key = f"{adapter.name}:{category_name}"
+        if html is None:
+            return
+        items = adapter.parse_listing(html, category_name)
+        logger.info(f"{adapter.name} {category_name} page {page}: {len(items)} items")
+        detail_urls = [adapter.detail_url(item) for item in items]
+        details = sum(1 for detail_url in detail_urls if detail_url)
+        if self.schedule:
+            url = adapter.listing_url(path, page)
+            self.schedule.record(url, adapter.name, category_name, page, items, details)
+        if not items:
+            if self.scrape_run:
+                self.scrape_run.category_done(key, page - 1)
+            return
+        # The next page is assumed to need as many detail pages as this one,
+        # whose own detail pages are still to be paid for
+        if page < self.max_pages and self.should_follow(
+            adapter, path, page + 1, cost=1 + 2 * details
+        ):
+            enqueue(
+                LISTING_PRIORITY,
+                "listing",
+                adapter.listing_url(path, page + 1),
+                (adapter, category_name, path, page + 1),
+            )
+        if self.scrape_run:
+            self.pages[(key, page)] = [len(items), []]
+        for item, detail_url in zip(items, detail_urls):
+            if detail_url:
+                payload = (adapter, item, key, page)
+                enqueue(DETAIL_PRIORITY, "detail", detail_url, payload)
+            else:
+                await self.item_done(key, page, item)
+
+    async def handle_detail(self, client, url, payload):
+        adapter, item, key, page = payload
+        try:
+            html = await self.fetch(client, url, self.detail_ttl)
+            if html:
+                item = adapter.parse_detail(html, item)
+        finally:
+            # The item is kept, incomplete, whatever failed with its page, or
+            # its listing page would never complete and hold back the rest
+            await self.item_done(key, page, item)
+
+    def should_follow(self, adapter, path, page, cost=1):
+        """Whether to queue the next listing page after a page with products
+
+        Unscheduled crawls walk every page. Scheduled crawls only follow
+        pages the schedule has never seen, while the request budget still
+        covers the cost in requests of doing so; known pages are revisited
+        when the schedule plans them.
+        """
+        if not self.schedule:
+            return True
+        if self.schedule.is_known(adapter.listing_url(path, page)):
+            return False
+        return self.budget is None or self.budget >= cost
+
+
+def crawl(adapters, **options):
+    """Run AsyncCrawler to completion and return the scraped items
+
+    With a scrape_run option, items are streamed to it instead and the
+    returned list is empty.
+    """
+    return asyncio.run(AsyncCrawler(adapters, **options).run())
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import math
+import os
+import time
+
+DEFAULT_SCHEDULE_PATH = "data/crawl_schedule.json"
+
+# A listing page seen less than this many seconds ago is never revisited
+MIN_REVISIT_INTERVAL = 3600
+
+
+def listing_fingerprint(items):
+    """Hash of the prices and stock of the products on a listing page"""
+    content = sorted(
+        (item.get("url") or "", item.get("price"), item.get("availability"))
+        for item in items
+    )
+    return hashlib.sha1(json.dumps(content).encode("utf-8")).hexdigest()
+
+
+class CrawlSchedule:
+    """Per listing URL history deciding which pages a budgeted crawl revisits.
+
+    Each listing page keeps when it was last seen, how often it was visited
+    and how often its prices or stock had changed since the previous visit.
+    Its priority is its age times its smoothed change rate,
+    (changes + 1) / (visits + 2). Volatile pages come back sooner than stable
+    ones, and every page is eventually revisited as it ages. Pages never seen
+    go first.
+    """
+
+    def __init__(self, path=DEFAULT_SCHEDULE_PATH, min_interval=MIN_REVISIT_INTERVAL):
+        self.path = path
+        self.min_interval = min_interval
+        self.pages = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.pages = json.load(f)
+
+    def is_known(self, url):
+        return url in self.pages
+
+    def priority(self, url, now):
+        page = self.pages.get(url)
+        if page is None:
+            return math.inf
+        age = now - page["last_seen"]
+        if age < self.min_interval:
+            return None
+        return age * (page["changes"] + 1) / (page["visits"] + 2)
+
+    def expected_details(self, site, url):
+        """Detail pages a listing page is expected to send the crawler to
+
+        Known pages use their last visit; unseen ones the average of the site.
+        """
+        page = self.pages.get(url)
+        if page is not None:
+            return page.get("details", 0)
+        counts = [
+            page.get("details", 0) for page in self.pages.values() if page["site"] == site
+        ]
+        return round(sum(counts) / len(counts)) if counts else 0
+
+    def plan(self, adapters, budget, max_pages):
+        """Listing pages to fetch this run, most urgent first, within budget requests
+
+        Each page costs one request plus the detail pages it is expected to
+        lead to, so the budget also covers those. Returns (adapter,
+        category_name, path, page) tuples. For each category, the candidates
+        are its known pages, plus the page after the last one with products
+        while the end of the category has not been seen.
+        """
+        now = time.time()
+        candidates = []
+        for adapter in adapters:
+            for category_name, path in adapter.categories.items():
+                known = {
+                    page["page"]: page
+                    for page in self.pages.values()
+                    if (page["site"], page["category"]) == (adapter.name, category_name)
+                }
+                pages = {page for page in known if page <= max_pages}
+                if not any(page["empty"] for page in known.values()):
+                    next_page = max(known, default=0) + 1
+                    if next_page <= max_pages:
+                        pages.add(next_page)
+                for page in pages:
+                    url = adapter.listing_url(path, page)
+                    priority = self.priority(url, now)
+                    if priority is not None:
+                        cost = 1 + self.expected_details(adapter.name, url)
+                        candidates.append(
+                            (priority, adapter.name, category_name, page, adapter, path, cost)
+                        )
+
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2], c[3]))
+        planned = []
+        for _, _, category_name, page, adapter, path, cost in candidates:
+            if budget is not None:
+                if cost > budget:
+                    continue
+                budget -= cost
+            planned.append((adapter, category_name, path, page))
+        return planned
+
+    def record(self, url, site, category_name, page, items, details=0):
+        """Note a visit to a listing page, whether its products changed and
+        how many detail pages it led to"""
+        fingerprint = listing_fingerprint(items)
+        previous = self.pages.get(url)
+        entry = previous or {"visits": 0, "changes": 0, "fingerprint": None}
+        if previous and previous["fingerprint"] != fingerprint:
+            entry["changes"] += 1
+        entry.update(
+            site=site,
+            category=category_name,
+            page=page,
+            visits=entry["visits"] + 1,
+            last_seen=time.time(),
+            fingerprint=fingerprint,
+            empty=not items,
+            details=details,
+        )
+        self.pages[url] = entry
+
+    def save(self):
+        dirpath = os.path.dirname(self.path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.pages, f)
+        os.replace(tmp_path, self.path)
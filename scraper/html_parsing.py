@@ -0,0 +1,22 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+# Parser used for every page the scrapers read; set to "html.parser" to
+# compare with the pure Python backend
+PARSER = DEFAULT_PARSER
+
+
+def make_soup(content, parse_only=None, parser=None):
+    """Parse a page, keeping only the tags matched by parse_only when given"""
+    return BeautifulSoup(content, parser or PARSER, parse_only=parse_only)
+
+
+def only(name, class_name):
+    """SoupStrainer keeping the <name> tags having class_name among their classes"""
+    return SoupStrainer(name, class_=class_name)
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+
+DEFAULT_CACHE_DIR = "data/http_cache"
+
+
+class CacheEntry:
+    def __init__(self, url, body, etag=None, last_modified=None, fetched_at=0.0):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl):
+        return ttl is not None and self.age() < ttl
+
+    def conditional_headers(self):
+        """Validators to send so the server can answer 304 Not Modified"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        elif self.fetched_at:
+            headers["If-Modified-Since"] = formatdate(self.fetched_at, usegmt=True)
+        return headers
+
+
+class ResponseCache:
+    """Response bodies and their validators on disk, one pair of files per URL.
+
+    <sha1 of url>.json holds the URL, ETag, Last-Modified and fetch time, and
+    <sha1 of url>.html the body, so cached pages can be parsed again offline.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".html"
+
+    def get(self, url):
+        meta_path, body_path = self.paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(
+            url,
+            body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            fetched_at=meta.get("fetched_at", 0.0),
+        )
+
+    def store(self, url, body, headers):
+        meta_path, body_path = self.paths(url)
+        entry = CacheEntry(
+            url,
+            body,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            fetched_at=time.time(),
+        )
+        # Body first: a metadata file is only ever written next to its body
+        self.write(body_path, body)
+        self.write_meta(meta_path, entry)
+        return entry
+
+    def touch(self, entry, headers=None):
+        """Record a 304 revalidation, taking any refreshed validators"""
+        if headers:
+            entry.etag = headers.get("ETag") or entry.etag
+            entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+        entry.fetched_at = time.time()
+        self.write_meta(self.paths(entry.url)[0], entry)
+        return entry
+
+    def write_meta(self, path, entry):
+        meta = {
+            "url": entry.url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "fetched_at": entry.fetched_at,
+        }
+        self.write(path, json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def write(path, data):
+        # Write then rename so a crash never leaves a truncated file behind
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -1,17 +1,33 @@
+import argparse
 import os
-import time
 import logging
+import queue
 import re
 import json
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from urllib.parse import urljoin
+from crawl_engine import USER_AGENT, SiteAdapter
+from html_parsing import make_soup, only
+from scrape_run import ScrapeRun
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://www.ryans.com/category/"
+
+PRODUCTS_ONLY = only("div", "category-single-product")
+ADD_TO_CART = re.compile("Add to Cart")
+
 DESIRED_CATEGORIES = {
     "CPU": "desktop-component-processor",
     "RAM": "desktop-component-desktop-ram",
@@ -19,16 +35,150 @@ DESIRED_CATEGORIES = {
 }
 
 
-class RyansScraper:
-    def __init__(self, headless=True):
-        self.base_url = "https://www.ryans.com/category/"
+def parse_product(container, category_name):
+    """Build an offer item from a category-single-product container"""
+    img = container.find("img", alt=True)
+    if not img:
+        return None
+    name = img["alt"].strip()
+    imgsrc = img.get("src", "")
+    image_url = (
+        imgsrc
+        if imgsrc.startswith("http")
+        else urljoin("https://www.ryans.com", imgsrc.lstrip("./"))
+    )
+    link = container.find("a", href=True)
+    url = urljoin("https://www.ryans.com", link["href"]) if link else ""
+    # Find price in anchor with pr-text class
+    price_tag = container.find("a", class_="pr-text")
+    price = None
+    if price_tag:
+        m = re.search(r"Tk\s*([\d,]+)", price_tag.get_text(strip=True))
+        if m:
+            price = int(m.group(1).replace(",", ""))
+    in_stock = container.find(string=ADD_TO_CART) is not None
+    availability = "In Stock" if in_stock else "Out of Stock"
+
+    item = {
+        "retailer": "ryans",
+        "retailer_name": name,
+        "price": price,
+        "url": url,
+        "image_url": image_url,
+        "availability": availability,
+        "category": category_name,
+    }
+    return item
+
+
+def find_products(content):
+    """Product containers of a listing page, parsing nothing else"""
+    return make_soup(content, PRODUCTS_ONLY).find_all(
+        "div", class_="category-single-product"
+    )
+
+
+class RyansAdapter(SiteAdapter):
+    """Ryans site definition for the async crawl engine.
+
+    Listing pages carry everything an item needs, so there are no detail
+    fetches. Only works where the listing HTML is served pre-rendered; pages
+    that need JavaScript still require RyansScraper.
+    """
+
+    name = "ryans"
+    base_url = BASE_URL
+    categories = DESIRED_CATEGORIES
+
+    def listing_url(self, slug, page):
+        return f"{self.base_url}{slug}?page={page}"
+
+    def parse_listing(self, html, category_name):
+        items = []
+        for cont in find_products(html):
+            info = parse_product(cont, category_name)
+            if info:
+                items.append(info)
+        return items
+
+
+class BrowserPool:
+    """Headless Chrome instances shared by the threads rendering category pages.
+
+    Browsers are started on first use, up to size, and handed out one thread
+    at a time; close() quits all of them.
+    """
+
+    def __init__(self, size=2, headless=True):
+        self.size = size
+        self.headless = headless
+        self.idle = queue.Queue()
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    def new_driver(self):
         chrome_options = Options()
-        if headless:
+        if self.headless:
             chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        self.driver = webdriver.Chrome(options=chrome_options)
+        # Product cards are in the DOM long before images finish loading
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.page_load_strategy = "eager"
+        return webdriver.Chrome(options=chrome_options)
+
+    @contextmanager
+    def driver(self):
+        with self.lock:
+            start_new = self.idle.empty() and len(self.drivers) < self.size
+            if start_new:
+                # Reserve the slot before the slow browser start
+                self.drivers.append(None)
+        if start_new:
+            try:
+                driver = self.new_driver()
+            except Exception:
+                # Free the slot, or other threads wait on idle for a browser
+                # that will never arrive
+                with self.lock:
+                    self.drivers.remove(None)
+                raise
+            with self.lock:
+                self.drivers[self.drivers.index(None)] = driver
+        else:
+            driver = self.idle.get()
+        try:
+            yield driver
+        finally:
+            self.idle.put(driver)
+
+    def close(self):
+        for driver in self.drivers:
+            if driver is not None:
+                driver.quit()
+        self.drivers = []
+        self.idle = queue.Queue()
+
+
+class RyansScraper:
+    def __init__(
+        self, headless=True, browsers=2, wait_timeout=10, fast_path=True, delay=1.0
+    ):
+        self.base_url = BASE_URL
+        self.pool = BrowserPool(browsers, headless)
+        self.wait_timeout = wait_timeout
+        self.fast_path = fast_path
+        self.fast_path_lock = threading.Lock()
+        # Set once a listing came with its product cards as served: from then
+        # on a listing without any is past the last page, not client-rendered
+        self.serves_static = False
+        # Seconds between requests to the site, across all category threads
+        self.delay = delay
+        self.pace_lock = threading.Lock()
+        self.next_request_at = 0.0
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
         self.categories = DESIRED_CATEGORIES
 
     @staticmethod
@@ -37,73 +187,121 @@ class RyansScraper:
         return int("".join(price_nums)) if price_nums else None
 
     def extract_product_info(self, container, category_name):
-        img = container.find("img", alt=True)
-        if not img:
+        return parse_product(container, category_name)
+
+    def wait_turn(self):
+        """Sleep until delay seconds have passed since the previous request"""
+        with self.pace_lock:
+            now = time.monotonic()
+            start = max(now, self.next_request_at)
+            self.next_request_at = start + self.delay
+        time.sleep(start - now)
+
+    def fetch_static(self, page_url):
+        """Listing HTML as served, "" when it holds no product cards or does
+        not exist (404), and None when the request failed"""
+        self.wait_turn()
+        try:
+            resp = self.session.get(page_url, timeout=10)
+            if resp.status_code == 404:
+                return ""
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"Static fetch failed for {page_url}: {e}")
             return None
-        name = img["alt"].strip()
-        imgsrc = img.get("src", "")
-        image_url = (
-            imgsrc
-            if imgsrc.startswith("http")
-            else urljoin("https://www.ryans.com", imgsrc.lstrip("./"))
-        )
-        link = container.find("a", href=True)
-        url = urljoin("https://www.ryans.com", link["href"]) if link else ""
-        # Find price in anchor with pr-text class
-        price_tag = container.find("a", class_=lambda c: c and "pr-text" in c)
-        price = None
-        if price_tag:
-            m = re.search(r"Tk\s*([\d,]+)", price_tag.get_text(strip=True))
-            if m:
-                price = int(m.group(1).replace(",", ""))
-        in_stock = "Add to Cart" in container.get_text()
-        availability = "In Stock" if in_stock else "Out of Stock"
-
-        item = {
-            "retailer": "ryans",
-            "retailer_name": name,
-            "price": price,
-            "url": url,
-            "image_url": image_url,
-            "availability": availability,
-            "category": category_name,
-        }
-        return item
-
-    def scrape_category(self, category_name, slug, max_pages=1):
-        logger.info(f"Scraping category {category_name}")
+        if "category-single-product" not in resp.text:
+            return ""
+        self.serves_static = True
+        return resp.text
+
+    def render(self, page_url):
+        """Listing HTML once the product cards are rendered, or None if none appear"""
+        with self.pool.driver() as driver:
+            self.wait_turn()
+            driver.get(page_url)
+            try:
+                WebDriverWait(driver, self.wait_timeout).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, ".category-single-product")
+                    )
+                )
+            except TimeoutException:
+                return None
+            return driver.page_source
+
+    def get_listing(self, page_url, page):
+        """Listing HTML, "" past the last page, or None if it could not be had"""
+        html = None
+        if self.fast_path:
+            html = self.fetch_static(page_url)
+            if html == "" and self.serves_static:
+                # Served without cards by a site that serves them: the end
+                return html
+            if not html and page == 1:
+                # The listing is rendered client-side; stop trying without a browser
+                with self.fast_path_lock:
+                    if self.fast_path:
+                        logger.info("Listing needs rendering, using the browser pool.")
+                    self.fast_path = False
+        if not html:
+            html = self.render(page_url)
+        return html
+
+    def scrape_category(self, category_name, slug, max_pages=1, run=None):
+        """Scrape up to max_pages listing pages of a category.
+
+        With a ScrapeRun, each page is streamed to it once parsed, and pages
+        it already holds are skipped.
+        """
+        key = f"ryans:{category_name}"
+        if run and run.is_done(key):
+            logger.info(f"Skipping {category_name}, finished in a previous run")
+            return []
+        first_page = run.next_page(key) if run else 1
+        logger.info(f"Scraping category {category_name} from page {first_page}")
         items = []
-        for page in range(1, max_pages + 1):
+        for page in range(first_page, max_pages + 1):
             page_url = f"{self.base_url}{slug}?page={page}"
             logger.info(f"→ {category_name} page {page}: {page_url}")
-            self.driver.get(page_url)
-            # Wait for JS to render
-            time.sleep(3)
-            # Optionally, scroll to bottom to load more (uncomment if needed)
-            # self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            # time.sleep(2)
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, "html.parser")
-            containers = soup.find_all(
-                "div", class_=lambda c: c and "category-single-product" in c
-            )
+            html = self.get_listing(page_url, page)
+            containers = find_products(html) if html else []
             if not containers:
                 logger.info("No more products found.")
+                # A render that timed out may be a failure rather than the end
+                if run and html is not None:
+                    run.category_done(key, page - 1)
                 break
+            page_items = []
             for cont in containers:
                 info = self.extract_product_info(cont, category_name)
                 if info:
-                    items.append(info)
-            time.sleep(1)
+                    page_items.append(info)
+            if run:
+                run.page_done(key, page, page_items)
+            items.extend(page_items)
         logger.info(f"Found {len(items)} items in {category_name}")
         return items
 
-    def scrape_all(self, max_pages_each=1):
+    def scrape_all(self, max_pages_each=1, run=None):
+        """Scrape the categories in parallel, each holding one pooled browser.
+
+        Returns all scraped products, or streams them to run when one is given.
+        """
         all_prod = []
-        for name, slug in self.categories.items():
-            prods = self.scrape_category(name, slug, max_pages_each)
-            all_prod.extend(prods)
-        self.driver.quit()
+        try:
+            with ThreadPoolExecutor(max_workers=self.pool.size) as executor:
+                futures = [
+                    executor.submit(
+                        self.scrape_category, name, slug, max_pages_each, run
+                    )
+                    for name, slug in self.categories.items()
+                ]
+                for future in futures:
+                    prods = future.result()
+                    if not run:
+                        all_prod.extend(prods)
+        finally:
+            self.pool.close()
         return all_prod
 
 
@@ -120,8 +318,28 @@ def save_to_json(products, filename="ryans_products.json"):
 
 
 if __name__ == "__main__":
-    scraper = RyansScraper(headless=True)
-    all_products = scraper.scrape_all(
-        max_pages_each=1
-    )  # Increase for more pages per category
-    save_to_json(all_products, "ryans_products.json")
+    parser = argparse.ArgumentParser(description="Scrape Ryans listings")
+    parser.add_argument("--max-pages", type=int, default=1)
+    parser.add_argument("--browsers", type=int, default=3)
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=1.0,
+        help="Seconds between requests to the site (default=1)",
+    )
+    parser.add_argument(
+        "--output",
+        default="data/ryans_products.ndjson",
+        help="NDJSON file products are streamed to",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint",
+    )
+    args = parser.parse_args()
+
+    scraper = RyansScraper(headless=True, browsers=args.browsers, delay=args.delay)
+    with ScrapeRun(args.output, resume=args.resume) as run:
+        scraper.scrape_all(max_pages_each=args.max_pages, run=run)
+    print(f"Wrote {run.written} products to {args.output}")
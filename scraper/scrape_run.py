@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+
+
+class ScrapeRun:
+    """Products streamed to an NDJSON file with resumable per-page checkpoints.
+
+    Products are appended one JSON object per line as each listing page
+    completes. Next to the output, <output>.checkpoint.json records for every
+    "<retailer>:<category>" key the last page written and whether the
+    category is finished, along with the output size at that point.
+
+    A resumed run truncates the output back to the checkpointed size, which
+    drops a page that was being written when the previous run stopped. It
+    then continues each category after its last written page and skips the
+    finished categories. Pages may complete out of order (for example, with
+    the async crawler). A page is held back until the pages before it are
+    written, so the checkpoint always describes a prefix of each category.
+    """
+
+    def __init__(self, output_path, resume=False):
+        self.output_path = output_path
+        self.checkpoint_path = f"{output_path}.checkpoint.json"
+        self.lock = threading.Lock()
+        self.state = {"offset": 0, "categories": {}}
+        # A checkpoint without its output describes products that are gone
+        resume = resume and os.path.exists(output_path)
+        if resume and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        dirpath = os.path.dirname(output_path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        self.output = open(output_path, "r+b" if resume else "wb")
+        self.output.truncate(self.state["offset"])
+        self.output.seek(self.state["offset"])
+        self.pending = {}
+        self.written = 0
+
+    def category(self, key):
+        return self.state["categories"].setdefault(
+            key, {"page": 0, "done": False, "last_page": None}
+        )
+
+    def is_done(self, key):
+        with self.lock:
+            return self.category(key)["done"]
+
+    def next_page(self, key):
+        """First page of a category not yet written"""
+        with self.lock:
+            return self.category(key)["page"] + 1
+
+    def page_done(self, key, page, items):
+        """Write a completed page once all the pages before it are written"""
+        with self.lock:
+            self.pending[(key, page)] = items
+            self.flush(key)
+
+    def category_done(self, key, last_page):
+        """Mark a category finished once its pages up to last_page are written"""
+        with self.lock:
+            self.category(key)["last_page"] = last_page
+            self.flush(key)
+
+    def flush(self, key):
+        category = self.category(key)
+        changed = False
+        while (key, category["page"] + 1) in self.pending:
+            items = self.pending.pop((key, category["page"] + 1))
+            for item in items:
+                line = json.dumps(item, ensure_ascii=False) + "\n"
+                self.output.write(line.encode("utf-8"))
+            self.written += len(items)
+            category["page"] += 1
+            changed = True
+        last_page = category["last_page"]
+        if last_page is not None and category["page"] >= last_page:
+            changed = changed or not category["done"]
+            category["done"] = True
+        if changed:
+            self.save()
+
+    def save(self):
+        # Products reach the disk before the checkpoint that covers them
+        self.output.flush()
+        os.fsync(self.output.fileno())
+        self.state["offset"] = self.output.tell()
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def close(self):
+        self.output.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_ndjson(products, filename):
+    """Write products to an NDJSON file in one go, without checkpoints"""
+    dirpath = os.path.dirname(filename)
+    if dirpath:
+        os.makedirs(dirpath, exist_ok=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        for product in products:
+            f.write(json.dumps(product, ensure_ascii=False) + "\n")
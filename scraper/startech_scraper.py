@@ -1,16 +1,27 @@
+import argparse
 import os
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
+from bs4 import SoupStrainer
 import logging
 import re
 import json
 from urllib.parse import urljoin
+from crawl_engine import SiteAdapter, crawl
+from html_parsing import make_soup, only
+from http_cache import DEFAULT_CACHE_DIR, ResponseCache
+from scrape_run import ScrapeRun
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://www.startech.com.bd"
+
+PRODUCTS_ONLY = only("div", "p-item")
+DESCRIPTION_ONLY = only("div", "short-description")
+ROWS_ONLY = SoupStrainer("tr")
+
+# Detail pages (and so models) rarely change; reuse cached ones for a week
+DETAIL_TTL = 7 * 24 * 3600
+
 DESIRED_CATEGORIES = {
     "CPU": "component/processor",
     "RAM": "component/ram",
@@ -18,117 +29,133 @@ DESIRED_CATEGORIES = {
 }
 
 
-class StarTechScraper:
-    def __init__(self):
-        self.base_url = "https://www.startech.com.bd"
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36"
-            }
-        )
-        self.categories = DESIRED_CATEGORIES
-
-    def get_page(self, url, max_retries=3):
-        for attempt in range(max_retries):
-            try:
-                resp = self.session.get(url, timeout=10)
-                resp.raise_for_status()
-                return resp
-            except requests.RequestException as e:
-                logger.warning(f"Attempt {attempt+1} failed for {url}: {e}")
-                time.sleep(2**attempt)
-        logger.error(f"Failed to fetch {url} after {max_retries} retries")
+def clean_price(price_str):
+    price_nums = re.findall(r"\d+", price_str.replace(",", ""))
+    return int("".join(price_nums)) if price_nums else None
+
+
+def parse_model(content):
+    """Extract the model from a product detail page"""
+    # 1. Check for 'li' elements under '.short-description'
+    desc = make_soup(content, DESCRIPTION_ONLY).find("div", class_="short-description")
+    if desc:
+        for li in desc.find_all("li"):
+            text = li.get_text(strip=True)
+            if text.lower().startswith("model:"):
+                return text.split(":", 1)[1].strip()
+    # 2. (Fallback) Look in any table rows (for other product types)
+    for row in make_soup(content, ROWS_ONLY).find_all("tr"):
+        tds = row.find_all("td")
+        if len(tds) >= 2:
+            label = tds[0].get_text(strip=True).lower()
+            value = tds[1].get_text(strip=True)
+            if "model" in label or "part no" in label or "product code" in label:
+                return value
+    return None
+
+
+def find_products(content):
+    """Product containers of a listing page, parsing nothing else"""
+    return make_soup(content, PRODUCTS_ONLY).find_all("div", class_="p-item")
+
+
+def parse_product(container, category_name, base_url=BASE_URL):
+    """Build an offer item from a listing container; the model is filled in later"""
+    name_el = container.find(["h4", "a"], class_="p-item-name")
+    if not name_el:
         return None
+    name = name_el.get_text(strip=True)
+    link = container.find("a")
+    url = urljoin(base_url, link["href"]) if link else ""
+    img = container.find("img")
+    image_url = urljoin(base_url, img["src"]) if img and img.get("src") else ""
+    price_el = container.find(["span", "div"], class_="price-new")
+    if not price_el:
+        price_el = container.find(["span", "div"], class_="price")
+    price_str = price_el.get_text(strip=True) if price_el else ""
+    price = clean_price(price_str)
+    in_stock = bool(
+        container.find("button", string=re.compile(r"Add to Cart|কার্টে যোগ করুন"))
+    )
+    availability = "In Stock" if in_stock else "Out of Stock"
+
+    item = {
+        "retailer": "startech",
+        "retailer_name": name,
+        "price": price,
+        "url": url,
+        "image_url": image_url,
+        "availability": availability,
+        "category": category_name,
+        "model": None,
+    }
+    return item
+
+
+class StarTechAdapter(SiteAdapter):
+    """StarTech site definition for the async crawl engine"""
+
+    name = "startech"
+    base_url = BASE_URL
+    categories = DESIRED_CATEGORIES
+
+    def listing_url(self, path, page):
+        return f"{self.base_url}/{path}?page={page}"
+
+    def parse_listing(self, html, category_name):
+        items = []
+        for cont in find_products(html):
+            info = parse_product(cont, category_name, self.base_url)
+            if info:
+                items.append(info)
+        return items
 
-    @staticmethod
-    def clean_price(price_str):
-        price_nums = re.findall(r"\d+", price_str.replace(",", ""))
-        return int("".join(price_nums)) if price_nums else None
-
-    def get_model_from_detail(self, product_url):
-        resp = self.get_page(product_url)
-        if not resp:
-            return None
-        soup = BeautifulSoup(resp.content, "html.parser")
-        # 1. Check for 'li' elements under '.short-description'
-        desc = soup.find("div", class_="short-description")
-        if desc:
-            for li in desc.find_all("li"):
-                text = li.get_text(strip=True)
-                if text.lower().startswith("model:"):
-                    return text.split(":", 1)[1].strip()
-        # 2. (Fallback) Look in any table rows (for other product types)
-        for row in soup.find_all("tr"):
-            tds = row.find_all("td")
-            if len(tds) >= 2:
-                label = tds[0].get_text(strip=True).lower()
-                value = tds[1].get_text(strip=True)
-                if "model" in label or "part no" in label or "product code" in label:
-                    return value
-        return None
+    def detail_url(self, item):
+        return item["url"] or None
 
-    def extract_product_info(self, container, category_name):
-        name_el = container.find(["h4", "a"], class_="p-item-name")
-        if not name_el:
-            return None
-        name = name_el.get_text(strip=True)
-        link = container.find("a")
-        url = urljoin(self.base_url, link["href"]) if link else ""
-        img = container.find("img")
-        image_url = urljoin(self.base_url, img["src"]) if img and img.get("src") else ""
-        price_el = container.find(["span", "div"], class_="price-new")
-        if not price_el:
-            price_el = container.find(["span", "div"], class_="price")
-        price_str = price_el.get_text(strip=True) if price_el else ""
-        price = self.clean_price(price_str)
-        in_stock = bool(
-            container.find("button", string=re.compile(r"Add to Cart|কার্টে যোগ করুন"))
-        )
-        availability = "In Stock" if in_stock else "Out of Stock"
-
-        model = self.get_model_from_detail(url) if url else None
-
-        item = {
-            "retailer": "startech",
-            "retailer_name": name,
-            "price": price,
-            "url": url,
-            "image_url": image_url,
-            "availability": availability,
-            "category": category_name,
-            "model": model,
-        }
+    def parse_detail(self, html, item):
+        item["model"] = parse_model(html)
         return item
 
-    def scrape_category(self, category_name, path, max_pages=2):
-        logger.info(f"Scraping category {category_name}")
-        items = []
-        for page in range(1, max_pages + 1):
-            page_url = f"{self.base_url}/{path}?page={page}"
-            logger.info(f"→ {category_name} page {page}: {page_url}")
-            resp = self.get_page(page_url)
-            if not resp:
-                break
-            soup = BeautifulSoup(resp.content, "html.parser")
-            containers = soup.find_all("div", class_="p-item")
-            if not containers:
-                logger.info("No more products found.")
-                break
-            for cont in containers:
-                info = self.extract_product_info(cont, category_name)
-                if info:
-                    items.append(info)
-            time.sleep(1)
-        logger.info(f"Found {len(items)} items in {category_name}")
-        return items
 
-    def scrape_all(self, max_pages_each=2):
-        all_prod = []
-        for name, path in self.categories.items():
-            prods = self.scrape_category(name, path, max_pages_each)
-            all_prod.extend(prods)
-        return all_prod
+class StarTechScraper:
+    """Scrapes StarTech with the shared async crawl engine; fetching, caching,
+    retries and politeness are all AsyncCrawler's"""
+
+    def __init__(
+        self,
+        max_per_host=4,
+        min_interval=0.25,
+        cache_dir=None,
+        detail_ttl=DETAIL_TTL,
+        offline=False,
+    ):
+        if offline and not cache_dir:
+            raise ValueError("Offline mode needs a cache directory to replay")
+        self.categories = DESIRED_CATEGORIES
+        self.options = dict(
+            max_per_domain=max_per_host,
+            min_interval=min_interval,
+            cache=ResponseCache(cache_dir) if cache_dir else None,
+            detail_ttl=detail_ttl,
+            offline=offline,
+        )
+
+    def scrape_category(self, category_name, path, max_pages=2, run=None):
+        """Scrape up to max_pages listing pages of a category.
+
+        With a ScrapeRun, each page is streamed to it once its models are
+        filled in, and pages it already holds are skipped.
+        """
+        adapter = StarTechAdapter()
+        adapter.categories = {category_name: path}
+        return crawl([adapter], max_pages=max_pages, scrape_run=run, **self.options)
+
+    def scrape_all(self, max_pages_each=2, run=None):
+        """Return all scraped products, or stream them to run when one is given"""
+        return crawl(
+            [StarTechAdapter()], max_pages=max_pages_each, scrape_run=run, **self.options
+        )
 
 
 def save_to_json(products, filename="data/startech_products.json"):
@@ -145,8 +172,44 @@ def save_to_json(products, filename="data/startech_products.json"):
 
 
 if __name__ == "__main__":
-    scraper = StarTechScraper()
-    all_products = scraper.scrape_all(
-        max_pages_each=5
-    )  # change to larger number for more pages
-    save_to_json(all_products)
+    parser = argparse.ArgumentParser(description="Scrape StarTech listings and models")
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Response cache directory (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Always download every page"
+    )
+    parser.add_argument(
+        "--detail-ttl",
+        type=int,
+        default=DETAIL_TTL,
+        help="Seconds a cached detail page is used without revalidation",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Parse cached pages only, without any network request",
+    )
+    parser.add_argument("--max-pages", type=int, default=5)
+    parser.add_argument(
+        "--output",
+        default="data/startech_products.ndjson",
+        help="NDJSON file products are streamed to",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint",
+    )
+    args = parser.parse_args()
+
+    scraper = StarTechScraper(
+        cache_dir=None if args.no_cache else args.cache_dir,
+        detail_ttl=args.detail_ttl,
+        offline=args.offline,
+    )
+    with ScrapeRun(args.output, resume=args.resume) as run:
+        scraper.scrape_all(max_pages_each=args.max_pages, run=run)
+    print(f"Wrote {run.written} products to {args.output}")